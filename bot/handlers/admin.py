@@ -1,5 +1,6 @@
 from aiogram import Router
 from aiogram.filters import Command
+from aiogram.methods import SendMessage
 from aiogram.types import Message
 
 from bot import texts
@@ -11,9 +12,8 @@ settings = get_settings()
 
 
 @router.message(Command("admin"))
-async def admin_entry(message: Message) -> None:
+async def admin_entry(message: Message) -> SendMessage:
     if message.from_user.id not in settings.admin_ids:
-        await message.answer(texts.ADMIN_ONLY)
-        return
+        return message.answer(texts.ADMIN_ONLY)
 
-    await message.answer(texts.ADMIN_DONE, reply_markup=admin_menu_keyboard())
+    return message.answer(texts.ADMIN_DONE, reply_markup=admin_menu_keyboard())
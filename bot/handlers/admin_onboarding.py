@@ -6,17 +6,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from bot import texts
 from bot.keyboards.reply import admin_menu_keyboard, phone_request_keyboard
 from bot.states.admin_onboarding import AdminOnboardingStates
-from shared.db.models import UserRole, UserStatus
+from shared.db.models import UserRole
 from shared.services.admin_notify import notify_registration_completed
-from shared.services.users import activate_user, get_user_by_phone, get_user_by_telegram_id
+from shared.services.user_cache import UserSnapshot
+from shared.services.users import activate_user, get_user_by_phone
 from shared.utils.validators import is_valid_name, normalize_name
 
 router = Router()
 
 
-async def start_admin_flow(message: Message, state: FSMContext, session: AsyncSession) -> None:
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if user and user.status == UserStatus.ACTIVE:
+async def start_admin_flow(
+    message: Message, state: FSMContext, user: UserSnapshot | None
+) -> None:
+    if user and user.is_active:
         await state.clear()
         await message.answer(texts.WELCOME_BACK, reply_markup=admin_menu_keyboard())
         return
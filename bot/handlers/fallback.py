@@ -1,19 +1,16 @@
 from aiogram import Router
+from aiogram.methods import SendMessage
 from aiogram.types import Message
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot import texts
-from shared.db.models import UserStatus
-from shared.services.users import get_user_by_telegram_id
+from shared.services.user_cache import UserSnapshot
 
 router = Router()
 
 
 @router.message()
-async def fallback(message: Message, session: AsyncSession) -> None:
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if not user or user.status != UserStatus.ACTIVE:
-        await message.answer(texts.NEED_START)
-        return
+async def fallback(message: Message, user: UserSnapshot | None) -> SendMessage:
+    if not user or not user.is_active:
+        return message.answer(texts.NEED_START)
 
-    await message.answer(texts.UNKNOWN_COMMAND)
+    return message.answer(texts.UNKNOWN_COMMAND)
@@ -1,28 +1,38 @@
 from aiogram import F, Router
-from aiogram.types import Message
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendMessage
+from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot import texts
+from bot.identity import bot_identity
+from bot.keyboards.inline import pager_keyboard, parse_pager
 from bot.keyboards.reply import admin_menu_keyboard
-from shared.db.models import UserRole, UserStatus
+from shared.db.models import User, UserRole
+from shared.services.pagination import Page
 from shared.settings import get_settings
-from shared.services.users import get_user_by_telegram_id, list_teacher_students
+from shared.services.user_cache import UserSnapshot
+from shared.services.users import list_teacher_students
 
 router = Router()
 settings = get_settings()
 
+STUDENTS_PAGE_SIZE = 20
+STUDENTS_PAGE = "mystudents_"
 
-async def _require_active_user(message: Message, session: AsyncSession):
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if not user or user.status != UserStatus.ACTIVE:
+
+async def _require_active_user(
+    message: Message, user: UserSnapshot | None
+) -> UserSnapshot | None:
+    if not user or not user.is_active:
         await message.answer(texts.NEED_START)
         return None
     return user
 
 
 @router.message(F.text.in_({"ℹ️ Profil", "👤 Profil", "ℹ️ Profile"}))
-async def profile(message: Message, session: AsyncSession) -> None:
-    user = await _require_active_user(message, session)
+async def profile(message: Message, user: UserSnapshot | None) -> SendMessage | None:
+    user = await _require_active_user(message, user)
     if not user:
         return
 
@@ -39,43 +49,76 @@ async def profile(message: Message, session: AsyncSession) -> None:
         f"Rol: {role_label}",
     ]
     if user.role == UserRole.TEACHER and user.teacher_ref_token:
-        bot_username = (await message.bot.get_me()).username
-        lines.append(
-            f"Referral link: https://t.me/{bot_username}?start=ref_{user.teacher_ref_token}"
-        )
-    await message.answer("\n".join(lines))
+        ref_link = await bot_identity.ref_link(message.bot, user.teacher_ref_token)
+        lines.append(f"Referral link: {ref_link}")
+    return message.answer("\n".join(lines))
 
 
 @router.message(F.text.in_({"🆘 Yordam", "🆘 Help"}))
-async def help_message(message: Message) -> None:
-    await message.answer(texts.HELP_TEXT)
+async def help_message(message: Message) -> SendMessage:
+    return message.answer(texts.HELP_TEXT)
 
 
 @router.message(F.text.in_({"📢 Broadcast (keyinroq)", "🧾 Loglar (keyinroq)"}))
-async def admin_placeholders(message: Message) -> None:
-    await message.answer(texts.ADMIN_SOON)
+async def admin_placeholders(message: Message) -> SendMessage:
+    return message.answer(texts.ADMIN_SOON)
 
 
-@router.message(F.text.in_({"👥 O‘quvchilarim", "👥 My Students"}))
-async def students_list(message: Message, session: AsyncSession) -> None:
-    user = await _require_active_user(message, session)
+async def _require_teacher(
+    message: Message, user: UserSnapshot | None
+) -> UserSnapshot | None:
+    user = await _require_active_user(message, user)
     if not user:
-        return
+        return None
     if user.telegram_id in settings.admin_ids:
         await message.answer(texts.TEACHER_ONLY, reply_markup=admin_menu_keyboard())
-        return
+        return None
     if user.role != UserRole.TEACHER:
         await message.answer(texts.TEACHER_ONLY)
-        return
+        return None
+    return user
 
-    students = await list_teacher_students(session, user.id)
-    if not students:
-        await message.answer(texts.NO_STUDENTS)
-        return
 
+def _render_students(page: Page[User], number: int = 0) -> str:
     lines = [texts.STUDENTS_LIST_TITLE]
-    for idx, student in enumerate(students, start=1):
-        lines.append(
-            f"{idx}. {student.name} | {student.phone} | {student.created_at:%Y-%m-%d}"
+    start = number * STUDENTS_PAGE_SIZE + 1
+    for idx, student in enumerate(page.items, start=start):
+        lines.append(f"{idx}. {student.name} | {student.phone} | {student.created_at:%Y-%m-%d}")
+    return "\n".join(lines)
+
+
+@router.message(F.text.in_({"👥 O‘quvchilarim", "👥 My Students"}))
+async def students_list(
+    message: Message, session: AsyncSession, user: UserSnapshot | None
+) -> SendMessage | None:
+    user = await _require_teacher(message, user)
+    if not user:
+        return
+
+    page = await list_teacher_students(session, user.id, STUDENTS_PAGE_SIZE)
+    if not page.items:
+        return message.answer(texts.NO_STUDENTS)
+    return message.answer(
+        _render_students(page), reply_markup=pager_keyboard(STUDENTS_PAGE, page)
+    )
+
+
+@router.callback_query(F.data.startswith(STUDENTS_PAGE))
+async def students_list_page(
+    call: CallbackQuery, session: AsyncSession, user: UserSnapshot | None
+) -> None:
+    user = await _require_teacher(call.message, user)
+    if user:
+        cursor, backward, number = parse_pager(call.data, STUDENTS_PAGE)
+        page = await list_teacher_students(
+            session, user.id, STUDENTS_PAGE_SIZE, cursor, backward
         )
-    await message.answer("\n".join(lines))
+        if page.items:
+            try:
+                await call.message.edit_text(
+                    _render_students(page, number),
+                    reply_markup=pager_keyboard(STUDENTS_PAGE, page, number),
+                )
+            except TelegramBadRequest:
+                pass
+    await call.answer()
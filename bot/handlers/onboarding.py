@@ -16,18 +16,17 @@ from bot.keyboards.inline import (
 )
 from bot.keyboards.reply import phone_request_keyboard
 from bot.states.onboarding import OnboardingStates
-from shared.db.models import UserRole, UserStatus
+from shared.db.models import UserRole
 from shared.services.admin_notify import notify_new_lead, notify_registration_completed
 from shared.services.lead_service import TelegramUserInfo, create_or_update_lead
+from shared.services.user_cache import UserSnapshot
 from shared.settings import get_settings
 from shared.utils.validators import is_valid_name, normalize_name
 from shared.services.users import (
     activate_user,
-    ensure_unique_teacher_token,
     get_teacher_by_ref_token,
     get_user_by_id,
     get_user_by_phone,
-    get_user_by_telegram_id,
 )
 
 router = Router()
@@ -44,7 +43,9 @@ async def _send_name_step(message: Message) -> None:
 
 
 @router.message(CommandStart())
-async def start(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def start(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserSnapshot | None
+) -> None:
     payload = ""
     if message.text:
         parts = message.text.split(maxsplit=1)
@@ -67,15 +68,14 @@ async def start(message: Message, state: FSMContext, session: AsyncSession) -> N
     )
     lead, created = await create_or_update_lead(session, lead_user, ref_token)
     if created:
-        await notify_new_lead(message.bot, lead)
+        notify_new_lead(message.bot, session, lead)
 
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if user and user.status == UserStatus.ACTIVE:
+    if user and user.is_active:
         await state.clear()
         if test_code and user.role == UserRole.STUDENT:
             from bot.handlers.student.join_test import start_join_with_code
 
-            await start_join_with_code(message, state, session, test_code)
+            await start_join_with_code(message, state, session, user, test_code)
             return
         await message.answer(texts.WELCOME_BACK, reply_markup=_menu_keyboard_for_role(user.role))
         return
@@ -83,7 +83,7 @@ async def start(message: Message, state: FSMContext, session: AsyncSession) -> N
     if message.from_user.id in settings.admin_ids:
         from bot.handlers.admin_onboarding import start_admin_flow
 
-        await start_admin_flow(message, state, session)
+        await start_admin_flow(message, state, user)
         return
 
     await state.clear()
@@ -177,10 +177,6 @@ async def handle_name(message: Message, state: FSMContext, session: AsyncSession
         return
 
     role = UserRole(role_value)
-    teacher_ref_token = None
-    if role == UserRole.TEACHER:
-        teacher_ref_token = await ensure_unique_teacher_token(session)
-
     user = await activate_user(
         session=session,
         telegram_id=message.from_user.id,
@@ -188,7 +184,6 @@ async def handle_name(message: Message, state: FSMContext, session: AsyncSession
         phone=phone,
         role=role,
         teacher_id=teacher_id,
-        teacher_ref_token=teacher_ref_token,
     )
     pending_test_code = data.get("pending_test_code")
     await state.clear()
@@ -212,7 +207,9 @@ async def handle_name(message: Message, state: FSMContext, session: AsyncSession
     if role == UserRole.STUDENT and pending_test_code:
         from bot.handlers.student.join_test import start_join_with_code
 
-        await start_join_with_code(message, state, session, pending_test_code)
+        await start_join_with_code(
+            message, state, session, UserSnapshot.from_user(user), pending_test_code
+        )
         return
 
 
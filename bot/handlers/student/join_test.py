@@ -8,11 +8,12 @@ from bot import texts
 from bot.keyboards.templates import student_progress_keyboard, summary_student_sections_keyboard
 from bot.states.student_join_test import StudentJoinTestStates
 from bot.utils.summary import build_student_summary, student_progress_stage
-from shared.db.models import UserRole, UserStatus
+from bot.utils.summary_message import render_summary
+from shared.db.models import UserRole
 from shared.models.attempt import AttemptStatus
 from shared.models.subject_template import SubjectTemplate
 from shared.models.test import TestStatus
-from shared.services.answer_key_service import (
+from shared.services.answer_parsing import (
     ValidationError,
     parse_open_ab_bulk,
     parse_y1_input,
@@ -20,13 +21,13 @@ from shared.services.answer_key_service import (
 )
 from shared.services.attempt_service import (
     AttemptError,
-    get_attempt,
+    get_standing,
     start_attempt,
     submit_attempt,
 )
 from shared.services.template_service import get_template_by_id
 from shared.services.test_service import get_test_by_code
-from shared.services.users import get_user_by_telegram_id
+from shared.services.user_cache import UserSnapshot
 
 router = Router()
 
@@ -53,20 +54,7 @@ async def _update_summary(
         attempt_id = data.get("attempt_id", 0)
         reply_markup = student_progress_keyboard(attempt_id, stage)
     text = build_student_summary(data, instruction=instruction, error=error)
-    summary_id = data.get("summary_message_id")
-    if summary_id:
-        try:
-            await message.bot.edit_message_text(
-                text,
-                chat_id=message.chat.id,
-                message_id=summary_id,
-                reply_markup=reply_markup,
-            )
-            return
-        except TelegramBadRequest:
-            pass
-    sent = await message.answer(text, reply_markup=reply_markup)
-    await state.update_data(summary_message_id=sent.message_id)
+    await render_summary(message, state, data, text, reply_markup)
 
 
 async def _delete_input(message: Message) -> None:
@@ -76,9 +64,8 @@ async def _delete_input(message: Message) -> None:
         pass
 
 
-async def _require_student(message: Message, session: AsyncSession):
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if not user or user.status != UserStatus.ACTIVE or user.role != UserRole.STUDENT:
+async def _require_student(message: Message, user: UserSnapshot | None) -> UserSnapshot | None:
+    if not user or not user.is_active or user.role != UserRole.STUDENT:
         await message.answer(texts.STUDENT_ONLY)
         return None
     return user
@@ -92,21 +79,31 @@ async def start_join(message: Message, state: FSMContext) -> None:
 
 
 async def start_join_with_code(
-    message: Message, state: FSMContext, session: AsyncSession, code: str
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+    user: UserSnapshot | None,
+    code: str,
 ) -> None:
     await state.clear()
-    await _handle_code(message, state, session, code)
+    await _handle_code(message, state, session, user, code)
 
 
 @router.message(StudentJoinTestStates.enter_code, F.text)
-async def handle_code(message: Message, state: FSMContext, session: AsyncSession) -> None:
-    await _handle_code(message, state, session, message.text.strip())
+async def handle_code(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserSnapshot | None
+) -> None:
+    await _handle_code(message, state, session, user, message.text.strip())
 
 
 async def _handle_code(
-    message: Message, state: FSMContext, session: AsyncSession, code: str
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+    user: UserSnapshot | None,
+    code: str,
 ) -> None:
-    user = await _require_student(message, session)
+    user = await _require_student(message, user)
     if not user:
         return
 
@@ -118,16 +115,14 @@ async def _handle_code(
         await message.answer(texts.TEST_NOT_PUBLISHED)
         return
 
-    attempt = await get_attempt(session, test.id, user.id)
-    if attempt and attempt.status == AttemptStatus.SUBMITTED:
-        await message.answer(texts.ALREADY_SUBMITTED)
-        return
-
     try:
         attempt = await start_attempt(session, test, user.id)
     except AttemptError:
         await message.answer(texts.TEST_NOT_PUBLISHED)
         return
+    if attempt.status == AttemptStatus.SUBMITTED:
+        await message.answer(texts.ALREADY_SUBMITTED)
+        return
 
     template: SubjectTemplate | None = await get_template_by_id(
         session, test.subject_template_id
@@ -301,9 +296,13 @@ async def submit_answers(call: CallbackQuery, state: FSMContext, session: AsyncS
     try:
         attempt = await submit_attempt(session, attempt, answers)
     except AttemptError:
+        await session.rollback()
         await call.message.answer(texts.GENERAL_RETRY)
         await call.answer()
         return
+    # The submit holds the test row and item-stats counters locked until commit;
+    # release them before any Bot API call instead of after the reply.
+    await session.commit()
 
     await state.clear()
     wrong_items = attempt.incorrect_items_json or {}
@@ -330,12 +329,18 @@ async def submit_answers(call: CallbackQuery, state: FSMContext, session: AsyncS
     else:
         feedback_line = "💪 Boshlanishi yaxshi. Xatolarni tahlil qilib, yana urinib ko‘ring."
 
+    standing = await get_standing(session, attempt)
+    standing_line = texts.STUDENT_STANDING.format(
+        rank=standing.rank, total=standing.total, percentile=standing.percentile
+    )
+
     await call.message.edit_text(
         texts.STUDENT_SUBMITTED_RESULT.format(
             y1=attempt.score_y1 or 0,
             y2=attempt.score_y2 or 0,
             o=attempt.score_o or 0,
             total=total,
+            standing_line=standing_line,
             feedback_line=feedback_line,
             wrong_line=wrong_line,
         )
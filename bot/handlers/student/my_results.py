@@ -1,46 +1,63 @@
 from aiogram import F, Router
-from aiogram.types import Message
-from sqlalchemy import select
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendMessage
+from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot import texts
-from shared.db.models import UserRole, UserStatus
-from shared.models.attempt import Attempt
-from shared.models.test import Test
-from shared.services.users import get_user_by_telegram_id
+from bot.keyboards.inline import pager_keyboard, parse_pager
+from shared.db.models import UserRole
+from shared.services.attempt_service import StudentResult, list_student_results
+from shared.services.pagination import Page
+from shared.services.user_cache import UserSnapshot
 
 router = Router()
 
+PAGE_SIZE = 10
+RESULTS_PAGE = "myresults_"
 
-async def _require_student(message: Message, session: AsyncSession):
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if not user or user.status != UserStatus.ACTIVE or user.role != UserRole.STUDENT:
+
+async def _require_student(message: Message, user: UserSnapshot | None) -> UserSnapshot | None:
+    if not user or not user.is_active or user.role != UserRole.STUDENT:
         await message.answer(texts.STUDENT_ONLY)
         return None
     return user
 
 
-@router.message(F.text == "📄 My Results")
-async def my_results(message: Message, session: AsyncSession) -> None:
-    user = await _require_student(message, session)
-    if not user:
-        return
+def _render(page: Page[StudentResult]) -> str:
+    lines = [texts.RESULTS_TITLE]
+    for result in page.items:
+        lines.append(f"{result.test_title} | {result.score_total or 0} | {result.status.value}")
+    return "\n".join(lines)
 
-    result = await session.execute(
-        select(Attempt, Test)
-        .join(Test, Attempt.test_id == Test.id)
-        .where(Attempt.student_id == user.id)
-        .order_by(Attempt.created_at.desc())
-    )
 
-    rows = result.all()
-    if not rows:
-        await message.answer(texts.NO_RESULTS)
+@router.message(F.text == "📄 My Results")
+async def my_results(
+    message: Message, session: AsyncSession, user: UserSnapshot | None
+) -> SendMessage | None:
+    user = await _require_student(message, user)
+    if not user:
         return
 
-    lines = [texts.RESULTS_TITLE]
-    for attempt, test in rows[:10]:
-        lines.append(
-            f"{test.title} | {attempt.score_total or 0} | {attempt.status.value}"
-        )
-    await message.answer("\n".join(lines))
+    page = await list_student_results(session, user.id, PAGE_SIZE)
+    if not page.items:
+        return message.answer(texts.NO_RESULTS)
+    return message.answer(_render(page), reply_markup=pager_keyboard(RESULTS_PAGE, page))
+
+
+@router.callback_query(F.data.startswith(RESULTS_PAGE))
+async def my_results_page(
+    call: CallbackQuery, session: AsyncSession, user: UserSnapshot | None
+) -> None:
+    user = await _require_student(call.message, user)
+    if user:
+        cursor, backward, number = parse_pager(call.data, RESULTS_PAGE)
+        page = await list_student_results(session, user.id, PAGE_SIZE, cursor, backward)
+        if page.items:
+            try:
+                await call.message.edit_text(
+                    _render(page), reply_markup=pager_keyboard(RESULTS_PAGE, page, number)
+                )
+            except TelegramBadRequest:
+                pass
+    await call.answer()
@@ -1,10 +1,12 @@
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
+from aiogram.methods import SendMessage
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot import texts
+from bot.identity import bot_identity
 from bot.keyboards.templates import (
     manage_test_keyboard,
     summary_teacher_sections_keyboard,
@@ -13,13 +15,14 @@ from bot.keyboards.templates import (
 )
 from bot.states.teacher_create_test import TeacherCreateTestStates
 from bot.utils.summary import build_teacher_summary, teacher_progress_stage
-from shared.db.models import UserRole, UserStatus
-from shared.services.answer_key_service import (
+from bot.utils.summary_message import render_summary
+from shared.db.models import UserRole
+from shared.services.answer_key_service import save_section_key
+from shared.services.answer_parsing import (
     ValidationError,
     parse_open_ab_bulk,
     parse_y1_input,
     parse_y2_choices,
-    save_section_key,
 )
 from shared.services.template_service import get_template_by_id, list_active_templates
 from shared.models.test import Test
@@ -30,7 +33,7 @@ from shared.services.test_service import (
     publish_test,
     update_material,
 )
-from shared.services.users import get_user_by_telegram_id
+from shared.services.user_cache import UserSnapshot
 
 router = Router()
 
@@ -59,20 +62,7 @@ async def _update_summary(
         test_id = data.get("test_id", 0)
         reply_markup = teacher_progress_keyboard(test_id, stage)
     text = build_teacher_summary(data, instruction=instruction, error=error)
-    summary_id = data.get("summary_message_id")
-    if summary_id:
-        try:
-            await message.bot.edit_message_text(
-                text,
-                chat_id=message.chat.id,
-                message_id=summary_id,
-                reply_markup=reply_markup,
-            )
-            return
-        except TelegramBadRequest:
-            pass
-    sent = await message.answer(text, reply_markup=reply_markup)
-    await state.update_data(summary_message_id=sent.message_id)
+    await render_summary(message, state, data, text, reply_markup)
 
 
 async def _delete_input(message: Message) -> None:
@@ -82,17 +72,18 @@ async def _delete_input(message: Message) -> None:
         pass
 
 
-async def _require_teacher(message: Message, session: AsyncSession):
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if not user or user.status != UserStatus.ACTIVE or user.role != UserRole.TEACHER:
+async def _require_teacher(message: Message, user: UserSnapshot | None) -> UserSnapshot | None:
+    if not user or not user.is_active or user.role != UserRole.TEACHER:
         await message.answer(texts.TEACHER_ONLY)
         return None
     return user
 
 
 @router.message(F.text == "📝 New Test")
-async def start_create_test(message: Message, state: FSMContext, session: AsyncSession) -> None:
-    user = await _require_teacher(message, session)
+async def start_create_test(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserSnapshot | None
+) -> None:
+    user = await _require_teacher(message, user)
     if not user:
         return
 
@@ -123,8 +114,10 @@ async def choose_template(call: CallbackQuery, state: FSMContext, session: Async
 
 
 @router.message(TeacherCreateTestStates.enter_title, F.text)
-async def enter_title(message: Message, state: FSMContext, session: AsyncSession) -> None:
-    user = await _require_teacher(message, session)
+async def enter_title(
+    message: Message, state: FSMContext, session: AsyncSession, user: UserSnapshot | None
+) -> None:
+    user = await _require_teacher(message, user)
     if not user:
         return
 
@@ -318,7 +311,7 @@ async def enter_open_bulk(message: Message, state: FSMContext, session: AsyncSes
 
 @router.callback_query(F.data.startswith("tconfirm_"))
 async def publish_test_handler(
-    call: CallbackQuery, state: FSMContext, session: AsyncSession
+    call: CallbackQuery, state: FSMContext, session: AsyncSession, user: UserSnapshot | None
 ) -> None:
     test_id = int(call.data.replace("tconfirm_", ""))
     test = await session.get(Test, test_id)
@@ -327,7 +320,6 @@ async def publish_test_handler(
         await call.answer()
         return
 
-    user = await get_user_by_telegram_id(session, call.from_user.id)
     if not user or user.id != test.teacher_id:
         await call.message.answer(texts.TEACHER_ONLY)
         await call.answer()
@@ -377,8 +369,7 @@ async def publish_test_handler(
 
     await publish_test(session, test)
     template = await get_template_by_id(session, test.subject_template_id)
-    bot_username = (await call.bot.get_me()).username
-    join_link = f"https://t.me/{bot_username}?start=test_{test.access_code}"
+    join_link = await bot_identity.test_link(call.bot, test.access_code)
     material_note = texts.TEACHER_MATERIAL_NOTE if test.material_file_id else ""
     await call.message.edit_text(
         texts.TEACHER_TEST_PUBLISHED.format(
@@ -451,29 +442,37 @@ async def cancel_teacher_flow(call: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "new_test")
-async def new_test_callback(call: CallbackQuery, state: FSMContext, session: AsyncSession) -> None:
+async def new_test_callback(
+    call: CallbackQuery, state: FSMContext, session: AsyncSession, user: UserSnapshot | None
+) -> None:
     await call.answer()
-    await start_create_test(call.message, state, session)
+    await start_create_test(call.message, state, session, user)
 
 
 @router.callback_query(F.data == "teacher_students")
-async def teacher_students_callback(call: CallbackQuery, session: AsyncSession) -> None:
+async def teacher_students_callback(
+    call: CallbackQuery, session: AsyncSession, user: UserSnapshot | None
+) -> SendMessage | None:
     from bot.handlers.menu import students_list
 
     await call.answer()
-    await students_list(call.message, session)
+    return await students_list(call.message, session, user)
 
 
 @router.callback_query(F.data.startswith("results_"))
-async def teacher_results_callback(call: CallbackQuery, session: AsyncSession) -> None:
+async def teacher_results_callback(
+    call: CallbackQuery, session: AsyncSession, user: UserSnapshot | None
+) -> SendMessage | None:
     from bot.handlers.teacher.my_tests import my_tests
 
     await call.answer()
-    await my_tests(call.message, session)
+    return await my_tests(call.message, session, user)
 
 
 @router.callback_query(F.data.startswith("close_"))
-async def close_test_callback(call: CallbackQuery, session: AsyncSession) -> None:
+async def close_test_callback(
+    call: CallbackQuery, session: AsyncSession, user: UserSnapshot | None
+) -> None:
     test_id = int(call.data.replace("close_", ""))
     test = await session.get(Test, test_id)
     if not test:
@@ -481,7 +480,6 @@ async def close_test_callback(call: CallbackQuery, session: AsyncSession) -> Non
         await call.answer()
         return
 
-    user = await get_user_by_telegram_id(session, call.from_user.id)
     if not user or user.id != test.teacher_id:
         await call.message.answer(texts.TEACHER_ONLY)
         await call.answer()
@@ -1,39 +1,168 @@
 from aiogram import F, Router
-from aiogram.types import Message
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, CommandObject
+from aiogram.methods import SendMessage
+from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot import texts
-from shared.db.models import UserRole, UserStatus
-from shared.services.attempt_service import count_attempts_for_test
-from shared.services.test_service import list_teacher_tests
-from shared.services.users import get_user_by_telegram_id
+from bot.keyboards.inline import pager_keyboard, parse_pager
+from shared.db.models import UserRole
+from shared.models import Test
+from shared.models.test import TestStatus
+from shared.services.answer_key_service import save_section_key
+from shared.services.answer_parsing import (
+    ValidationError,
+    parse_open_ab_bulk,
+    parse_y1_input,
+    parse_y2_choices,
+)
+from shared.services.item_stats import ItemStat, get_item_stats
+from shared.services.pagination import Page
+from shared.services.scoring_service import SECTIONS
+from shared.services.template_service import get_template_by_id
+from shared.services.test_service import (
+    TestSummary,
+    get_test_by_code,
+    list_teacher_test_summaries,
+)
+from shared.services.user_cache import UserSnapshot
 
 router = Router()
 
+PAGE_SIZE = 10
+TESTS_PAGE = "mytests_"
 
-async def _require_teacher(message: Message, session: AsyncSession):
-    user = await get_user_by_telegram_id(session, message.from_user.id)
-    if not user or user.status != UserStatus.ACTIVE or user.role != UserRole.TEACHER:
+
+async def _require_teacher(message: Message, user: UserSnapshot | None) -> UserSnapshot | None:
+    if not user or not user.is_active or user.role != UserRole.TEACHER:
         await message.answer(texts.TEACHER_ONLY)
         return None
     return user
 
 
+def _render(page: Page[TestSummary]) -> str:
+    lines = [texts.MY_TESTS_TITLE]
+    for test in page.items:
+        lines.append(
+            f"{test.title} | {test.status.value} | {test.access_code} | attempts: {test.attempts}"
+        )
+    return "\n".join(lines)
+
+
 @router.message(F.text == "📋 My Tests")
-async def my_tests(message: Message, session: AsyncSession) -> None:
-    user = await _require_teacher(message, session)
+async def my_tests(
+    message: Message, session: AsyncSession, user: UserSnapshot | None
+) -> SendMessage | None:
+    user = await _require_teacher(message, user)
     if not user:
         return
 
-    tests = await list_teacher_tests(session, user.id)
-    if not tests:
-        await message.answer(texts.NO_TESTS)
+    page = await list_teacher_test_summaries(session, user.id, PAGE_SIZE)
+    if not page.items:
+        return message.answer(texts.NO_TESTS)
+    return message.answer(_render(page), reply_markup=pager_keyboard(TESTS_PAGE, page))
+
+
+@router.callback_query(F.data.startswith(TESTS_PAGE))
+async def my_tests_page(
+    call: CallbackQuery, session: AsyncSession, user: UserSnapshot | None
+) -> None:
+    user = await _require_teacher(call.message, user)
+    if user:
+        cursor, backward, number = parse_pager(call.data, TESTS_PAGE)
+        page = await list_teacher_test_summaries(session, user.id, PAGE_SIZE, cursor, backward)
+        if page.items:
+            try:
+                await call.message.edit_text(
+                    _render(page), reply_markup=pager_keyboard(TESTS_PAGE, page, number)
+                )
+            except TelegramBadRequest:
+                pass
+    await call.answer()
+
+
+def _render_item_stats(test: Test, stats: list[ItemStat]) -> str:
+    lines = [texts.ITEM_STATS_TITLE.format(title=test.title, answered=stats[0].answered)]
+    for stat in stats:
+        line = (
+            f"{stat.item_no} ({stat.section_code}): "
+            f"✅ {stat.correct} ❌ {stat.wrong} ⬜ {stat.blank}"
+        )
+        if stat.options:
+            line += " | " + " ".join(
+                f"{option}:{count}" for option, count in sorted(stat.options.items())
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+
+@router.message(Command("itemstats"))
+async def item_stats(
+    message: Message,
+    command: CommandObject,
+    session: AsyncSession,
+    user: UserSnapshot | None,
+) -> SendMessage | None:
+    user = await _require_teacher(message, user)
+    if not user:
         return
 
-    lines = [texts.MY_TESTS_TITLE]
-    for test in tests[:10]:
-        attempts = await count_attempts_for_test(session, test.id)
-        lines.append(
-            f"{test.title} | {test.status.value} | {test.access_code} | attempts: {attempts}"
+    code = (command.args or "").strip().upper()
+    if not code:
+        return message.answer(texts.ITEM_STATS_USAGE)
+    test = await get_test_by_code(session, code)
+    if not test or test.teacher_id != user.id:
+        return message.answer(texts.TEST_NOT_FOUND)
+    stats = await get_item_stats(session, test.id)
+    if not stats:
+        return message.answer(texts.ITEM_STATS_EMPTY)
+    return message.answer(_render_item_stats(test, stats))
+
+
+def _parse_section_key(section_code: str, raw: str, structure: dict) -> dict:
+    """Parse ``raw`` into the answer-key payload the creation flow stores for the section."""
+    section = next((s for s in structure.get("sections", []) if s["code"] == section_code), {})
+    if section_code == "Y1":
+        return {"answers": parse_y1_input(raw, expected_len=section.get("item_count", 32))}
+    if section_code == "Y2":
+        return {"answers": parse_y2_choices(raw, section.get("item_numbers", [33, 34, 35]))}
+    item_numbers = section.get("item_numbers", [36, 37, 38, 39, 40, 41, 42, 43, 44, 45])
+    open_items = parse_open_ab_bulk(raw, item_numbers)
+    items = [
+        {"item_no": item_no, "a": open_items[item_no]["a"], "b": open_items[item_no]["b"]}
+        for item_no in item_numbers
+    ]
+    return {"items": items, "subparts": True}
+
+
+@router.message(Command("fixkey"))
+async def fix_key(
+    message: Message,
+    command: CommandObject,
+    session: AsyncSession,
+    user: UserSnapshot | None,
+) -> SendMessage | None:
+    user = await _require_teacher(message, user)
+    if not user:
+        return
+
+    code, section_code, raw = ((command.args or "").split(maxsplit=2) + ["", "", ""])[:3]
+    section_code = section_code.upper()
+    if not code or section_code not in SECTIONS or not raw:
+        return message.answer(texts.FIX_KEY_USAGE)
+    test = await get_test_by_code(session, code.upper())
+    if not test or test.teacher_id != user.id:
+        return message.answer(texts.TEST_NOT_FOUND)
+    if test.status == TestStatus.DRAFT:
+        return message.answer(texts.TEST_NOT_PUBLISHED)
+    template = await get_template_by_id(session, test.subject_template_id)
+    try:
+        payload = _parse_section_key(
+            section_code, raw, template.structure_json if template else {}
         )
-    await message.answer("\n".join(lines))
+    except ValidationError as exc:
+        return message.answer(f"{exc}\n\n{texts.FIX_KEY_USAGE}")
+    # Re-scores submitted attempts; committed with the rest of this update.
+    await save_section_key(session, test.id, section_code, payload)
+    return message.answer(texts.FIX_KEY_DONE.format(section=section_code))
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+class BotIdentity:
+    """Cached ``getMe`` result and ``t.me`` deep-link builder."""
+
+    def __init__(self, refresh_interval: float = 3600.0) -> None:
+        self._refresh_interval = refresh_interval
+        self._username: str | None = None
+        self._task: asyncio.Task | None = None
+
+    async def resolve(self, bot: Bot) -> str:
+        me = await bot.get_me()
+        self._username = me.username
+        return self._username
+
+    def start_refresh(self, bot: Bot) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop(bot))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_loop(self, bot: Bot) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_interval)
+            try:
+                await self.resolve(bot)
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to refresh bot identity")
+
+    async def username(self, bot: Bot) -> str:
+        if self._username is None:
+            return await self.resolve(bot)
+        return self._username
+
+    async def deep_link(self, bot: Bot, payload: str) -> str:
+        return f"https://t.me/{await self.username(bot)}?start={payload}"
+
+    async def ref_link(self, bot: Bot, token: str) -> str:
+        return await self.deep_link(bot, f"ref_{token}")
+
+    async def test_link(self, bot: Bot, access_code: str) -> str:
+        return await self.deep_link(bot, f"test_{access_code}")
+
+
+bot_identity = BotIdentity()
@@ -1,6 +1,7 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from bot import texts
+from shared.services.pagination import Cursor, Page
 
 ROLE_TEACHER = "role_teacher"
 ROLE_STUDENT = "role_student"
@@ -27,3 +28,36 @@ def back_to_phone_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[[InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BACK_TO_PHONE)]]
     )
+
+
+def pager_keyboard(prefix: str, page: Page, number: int = 0) -> InlineKeyboardMarkup | None:
+    """Prev/next buttons for ``page``, the ``number``-th page (0-based) of a list."""
+    row = []
+    if page.prev_cursor:
+        row.append(
+            InlineKeyboardButton(
+                text=texts.PAGE_PREV,
+                callback_data=f"{prefix}p{number - 1}_{page.prev_cursor.encode()}",
+            )
+        )
+    if page.next_cursor:
+        row.append(
+            InlineKeyboardButton(
+                text=texts.PAGE_NEXT,
+                callback_data=f"{prefix}n{number + 1}_{page.next_cursor.encode()}",
+            )
+        )
+    return InlineKeyboardMarkup(inline_keyboard=[row]) if row else None
+
+
+def parse_pager(data: str, prefix: str) -> tuple[Cursor | None, bool, int]:
+    """Return the cursor, whether to page backward and the target page number
+    from pager callback data.
+
+    Malformed or stale data falls back to the first page.
+    """
+    head, _, raw = data[len(prefix):].partition("_")
+    try:
+        return Cursor.decode(raw), head[:1] == "p", max(int(head[1:]), 0)
+    except (ValueError, OverflowError):
+        return None, False, 0
@@ -1,25 +1,50 @@
 import logging
+import secrets
 
 from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
 from aiogram.types import Update
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Request, Response
+from pydantic import ValidationError
 
 from bot.handlers import admin, admin_onboarding, fallback, menu, onboarding
 from bot.handlers.student import join_test, my_results
 from bot.handlers.teacher import create_test, my_tests
+from bot.identity import bot_identity
+from bot.middlewares.auth import UserMiddleware
 from bot.middlewares.db import DbSessionMiddleware
 from bot.startup import setup_webhook
+from bot.update_dedup import UpdateDeduplicator
+from bot.update_queue import UpdateQueue, UpdateQueueFull
+from bot.webhook_reply import build_webhook_reply
+from shared.db.engine import admission, pool_metrics
+from shared.services.admin_notify import admin_notifier
+from shared.services.audit import audit_writer
+from shared.services.lead_service import lead_touches
+from shared.services.score_ranks import score_ranks
+from shared.services.scoring_cache import scoring_plans
+from shared.services.test_service import test_codes
+from shared.services.users import ref_tokens, user_cache
 from shared.settings import get_settings
+from shared.utils.outbound import OutboundScheduler
 
 settings = get_settings()
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s %(message)s")
 
 bot = Bot(token=settings.bot_token)
+outbound = OutboundScheduler(
+    global_rate=settings.outbound_global_rate,
+    chat_rate=settings.outbound_chat_rate,
+    chat_burst=settings.outbound_chat_burst,
+)
+bot.session.middleware(outbound)
 dp = Dispatcher()
 
 dp.message.middleware(DbSessionMiddleware())
 dp.callback_query.middleware(DbSessionMiddleware())
+dp.message.middleware(UserMiddleware())
+dp.callback_query.middleware(UserMiddleware())
 
 for router in (
     admin_onboarding.router,
@@ -34,32 +59,117 @@ for router in (
 ):
     dp.include_router(router)
 
+update_queue = UpdateQueue(
+    dp,
+    bot,
+    maxsize=settings.update_queue_size,
+    lanes=settings.update_lanes,
+)
+
+update_dedup = UpdateDeduplicator(
+    size=settings.update_dedup_size,
+    max_age=settings.update_dedup_max_age_seconds,
+)
+
 app = FastAPI()
 
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+METRICS_HEADER = "x-metrics-token"
+OK_BODY = b'{"ok":true}'
+
+webhook_replies = {"in_body": 0, "called": 0}
+
+
+def _queue_mode() -> bool:
+    return settings.webhook_mode.lower() == "queue"
+
 
 @app.on_event("startup")
 async def on_startup() -> None:
+    if _queue_mode():
+        await update_queue.start()
+    lead_touches.start()
+    audit_writer.start()
     await setup_webhook(bot)
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     await bot.delete_webhook()
+    await bot_identity.stop()
+    await update_queue.stop()
+    await lead_touches.stop()
+    await audit_writer.stop()
+    await admin_notifier.stop()
 
 
 @app.post(settings.webhook_path)
-async def telegram_webhook(
-    update: dict,
-    x_telegram_bot_api_secret_token: str | None = Header(default=None),
-) -> dict:
-    if x_telegram_bot_api_secret_token != settings.webhook_secret_token:
-        raise HTTPException(status_code=403, detail="Invalid secret token")
-
-    telegram_update = Update.model_validate(update)
-    await dp.feed_update(bot, telegram_update)
-    return {"ok": True}
+async def telegram_webhook(request: Request) -> Response:
+    # The secret is checked before the body is read, so forged requests never
+    # cost a JSON decode.
+    supplied = request.headers.get(SECRET_HEADER, "").encode()
+    if not secrets.compare_digest(supplied, settings.webhook_secret_token.encode()):
+        return Response(status_code=403)
+
+    try:
+        telegram_update = Update.model_validate_json(await request.body(), context={"bot": bot})
+    except ValidationError:
+        return Response(status_code=400)
+
+    # Telegram redelivers updates it considers unanswered; ack them without dispatching.
+    if update_dedup.check_and_add(telegram_update.update_id):
+        return Response(OK_BODY, media_type="application/json")
+
+    if _queue_mode():
+        try:
+            update_queue.put_nowait(telegram_update)
+        except UpdateQueueFull:
+            update_dedup.forget(telegram_update.update_id)
+            return Response(status_code=503)
+        return Response(OK_BODY, media_type="application/json")
+
+    try:
+        response = await dp.feed_update(bot, telegram_update)
+    except BaseException:
+        # The 500 makes Telegram redeliver; let that redelivery through.
+        update_dedup.forget(telegram_update.update_id)
+        raise
+    if isinstance(response, TelegramMethod):
+        if settings.webhook_reply_in_body:
+            body = build_webhook_reply(bot, response)
+            if body is not None:
+                webhook_replies["in_body"] += 1
+                return Response(body, media_type="application/json")
+        webhook_replies["called"] += 1
+        await dp.silent_call_request(bot, response)
+    return Response(OK_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_model=None)
+async def metrics(request: Request) -> dict | Response:
+    # Served by the same public app as the webhook, so it needs a token too.
+    token = settings.metrics_token or settings.webhook_secret_token
+    supplied = request.headers.get(METRICS_HEADER, "").encode()
+    if not secrets.compare_digest(supplied, token.encode()):
+        return Response(status_code=403)
+    return {
+        "update_queue": update_queue.stats(),
+        "update_dedup": update_dedup.stats(),
+        "webhook_replies": webhook_replies,
+        "outbound": outbound.stats(),
+        "db_pool": pool_metrics.stats(),
+        "db_admission": admission.stats(),
+        "user_cache": user_cache.stats(),
+        "test_codes": test_codes.stats(),
+        "ref_tokens": ref_tokens.stats(),
+        "lead_touches": lead_touches.stats(),
+        "audit": audit_writer.stats(),
+        "admin_notify": admin_notifier.stats(),
+        "scoring_plans": scoring_plans.stats(),
+        "score_ranks": score_ranks.stats(),
+    }
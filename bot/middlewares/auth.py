@@ -0,0 +1,30 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject, User as TelegramUser
+
+from shared.services.users import resolve_user
+
+
+class UserMiddleware(BaseMiddleware):
+    """Resolve the sender once per update and expose it to handlers as ``user``.
+
+    Must run after ``DbSessionMiddleware``; a cache hit never touches the session.
+    Runs after filters, so only handlers that take a ``user`` argument pay for
+    the lookup; the others (most FSM steps) never open a session for it.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        target: HandlerObject | None = data.get("handler")
+        if target is not None and not target.varkw and "user" not in target.params:
+            return await handler(event, data)
+        sender: TelegramUser | None = data.get("event_from_user")
+        data["user"] = await resolve_user(data["session"], sender.id) if sender else None
+        return await handler(event, data)
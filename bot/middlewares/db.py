@@ -1,11 +1,18 @@
+import logging
 from collections.abc import Awaitable, Callable
 from typing import Any
 
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
-from sqlalchemy.ext.asyncio import AsyncSession
+from aiogram.types import CallbackQuery, Message, TelegramObject
 
-from shared.db.engine import SessionLocal
+from bot import texts
+from shared.db.admission import DbOverloaded
+from shared.db.engine import pool_metrics
+from shared.db.session import LazySession
+from shared.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class DbSessionMiddleware(BaseMiddleware):
@@ -15,6 +22,18 @@ class DbSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        async with SessionLocal() as session:
-            data["session"] = session
-            return await handler(event, data)
+        session = LazySession(unit_of_work=settings.db_unit_of_work)
+        data["session"] = session
+        with pool_metrics.track_update():
+            try:
+                result = await handler(event, data)
+                if session.materialized and session.in_transaction():
+                    await session.commit()
+                return result
+            except DbOverloaded as exc:
+                logger.warning("Shedding update: %s", exc)
+                if isinstance(event, (Message, CallbackQuery)):
+                    await event.answer(texts.SERVER_BUSY)
+                return None
+            finally:
+                await session.close()
@@ -3,6 +3,7 @@ import logging
 
 from aiogram import Bot
 
+from bot.identity import bot_identity
 from shared.settings import get_settings
 from shared.utils.ngrok import NgrokError, fetch_public_ngrok_url
 
@@ -30,6 +31,10 @@ async def _fetch_ngrok_url_with_retry() -> str:
 
 
 async def setup_webhook(bot: Bot) -> None:
+    username = await bot_identity.resolve(bot)
+    logger.info("Running as @%s", username)
+    bot_identity.start_refresh(bot)
+
     base_url = await _resolve_webhook_base_url()
     webhook_url = f"{base_url}{settings.webhook_path}"
 
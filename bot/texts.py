@@ -114,8 +114,20 @@ TEACHER_MATERIAL_NOTE = "📎 Material biriktirildi.\n\n"
 TEACHER_CLOSE_SOON = "Test yopildi. Yangi test yaratishingiz mumkin."
 TEST_NOT_FOUND = "Test topilmadi."
 GENERAL_RETRY = "Nimadir xato bo‘ldi. Iltimos, qayta urinib ko‘ring."
+SERVER_BUSY = "Hozir server band. Iltimos, birozdan so‘ng qayta urinib ko‘ring."
 NO_TESTS = "Hozircha testlaringiz yo‘q."
 MY_TESTS_TITLE = "Testlaringiz:"
+ITEM_STATS_USAGE = "Savollar statistikasi: /itemstats TEST_KODI"
+ITEM_STATS_EMPTY = "Bu test bo‘yicha hali javoblar yo‘q."
+ITEM_STATS_TITLE = (
+    "📊 {title} — savollar bo‘yicha ({answered} ta javob)\n"
+    "✅ to‘g‘ri | ❌ xato | ⬜ bo‘sh"
+)
+FIX_KEY_USAGE = (
+    "Kalitni tuzatish: /fixkey TEST_KODI BO‘LIM JAVOBLAR\n"
+    "Bo‘lim: Y1, Y2 yoki O. Javoblar test yaratishdagi formatda."
+)
+FIX_KEY_DONE = "✅ {section} kaliti yangilandi, natijalar qayta hisoblandi."
 ENTER_TEST_CODE = "Test kodini yuboring."
 TEST_CODE_NOT_FOUND = "Kod topilmadi. Qayta tekshirib yuboring."
 TEST_NOT_PUBLISHED = "Test hali e’lon qilinmagan."
@@ -124,10 +136,13 @@ SUBMIT_CONFIRM = "Javoblarni yuborishni tasdiqlaysizmi?"
 RESULT_SUMMARY = "Natija:\nY1: {y1}/32\nY2: {y2}/3\nO: {o}/10\nJami: {total}/45"
 NO_RESULTS = "Hozircha natijalar yo‘q."
 RESULTS_TITLE = "Natijalar:"
+PAGE_PREV = "⬅️ Oldingi"
+PAGE_NEXT = "Keyingi ➡️"
 STUDENT_ONLY = "Bu bo‘lim faqat o‘quvchilar uchun."
 STUDENT_SUBMITTED_RESULT = (
     "✅ Test yakunlandi!\n"
-    "🎯 Natijangiz: {total}/45\n\n"
+    "🎯 Natijangiz: {total}/45\n"
+    "{standing_line}\n\n"
     "Bo‘limlar:\n"
     "• 1–32 (Y-1): {y1}/32\n"
     "• 33–35: {y2}/3\n"
@@ -137,4 +152,7 @@ STUDENT_SUBMITTED_RESULT = (
     "Natijalar saqlandi. Xohlasangiz, keyin ham ko‘rib turasiz."
 )
 STUDENT_SUBMITTED_RESULT_NO_WRONGS = "🔥 Zo‘r! Hammasi to‘g‘ri."
+STUDENT_STANDING = (
+    "🏅 O‘rningiz: {rank}/{total} (boshqa ishtirokchilarning {percentile}% idan yaxshi yoki teng)"
+)
 ALL_DONE_INSTRUCTION = "Hamma bo'limlar tayyor. Tasdiqlash tugmasini bosing."
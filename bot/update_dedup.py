@@ -0,0 +1,79 @@
+import time
+from array import array
+
+# Telegram update ids are positive, so this never collides with a real one.
+_FORGOTTEN = -1
+
+
+class UpdateDeduplicator:
+    """Sliding window of recently seen ``update_id`` values.
+
+    Ids live in a fixed-size ring buffer (packed ``array`` storage) mirrored by a
+    set for O(1) membership checks. Entries leave the window when the ring wraps
+    or when they are older than ``max_age`` seconds.
+    """
+
+    def __init__(self, size: int, max_age: float) -> None:
+        self._size = max(1, size)
+        self._max_age = max_age
+        self._ids = array("q", bytes(8 * self._size))
+        self._times = array("d", bytes(8 * self._size))
+        self._seen: set[int] = set()
+        self._head = 0
+        self._count = 0
+        self._absorbed = 0
+
+    def _evict_oldest(self) -> None:
+        oldest = (self._head - self._count) % self._size
+        self._seen.discard(self._ids[oldest])
+        self._count -= 1
+
+    def _expire(self, now: float) -> None:
+        deadline = now - self._max_age
+        while self._count and self._times[(self._head - self._count) % self._size] < deadline:
+            self._evict_oldest()
+
+    def check_and_add(self, update_id: int) -> bool:
+        """Return True if ``update_id`` is a redelivery, otherwise remember it."""
+        now = time.monotonic()
+        self._expire(now)
+        if update_id in self._seen:
+            self._absorbed += 1
+            return True
+        if self._count == self._size:
+            self._evict_oldest()
+        self._ids[self._head] = update_id
+        self._times[self._head] = now
+        self._head = (self._head + 1) % self._size
+        self._count += 1
+        self._seen.add(update_id)
+        return False
+
+    def forget(self, update_id: int) -> None:
+        """Drop ``update_id`` so a redelivery is dispatched again.
+
+        Used when the update could not be enqueued or its dispatch failed.
+        Other updates may have been added since, so an id that is no longer
+        the latest is blanked in place and left to age out of the ring.
+        """
+        if update_id not in self._seen:
+            return
+        self._seen.discard(update_id)
+        last = (self._head - 1) % self._size
+        if self._ids[last] == update_id:
+            self._head = last
+            self._count -= 1
+            return
+        for offset in range(2, self._count + 1):
+            slot = (self._head - offset) % self._size
+            if self._ids[slot] == update_id:
+                self._ids[slot] = _FORGOTTEN
+                return
+
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "max_age_seconds": self._max_age,
+            "tracked": self._count,
+            "absorbed": self._absorbed,
+        }
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateQueueFull(RuntimeError):
+    pass
+
+
+def update_chat_key(update: Update) -> int:
+    chat, user, _ = UserContextMiddleware.resolve_event_context(update)
+    if chat is not None:
+        return chat.id
+    if user is not None:
+        return user.id
+    return update.update_id
+
+
+class _Lane:
+    def __init__(self, maxsize: int) -> None:
+        self.queue: asyncio.Queue[tuple[float, Update]] = asyncio.Queue(maxsize=maxsize)
+        self.busy = False
+        self.processed = 0
+        self.rejected = 0
+
+
+class UpdateQueue:
+    """Bounded in-process queue between the webhook endpoint and the dispatcher.
+
+    Updates are hashed by chat onto ``lanes`` FIFO lanes with one worker each, so
+    updates from one chat are processed strictly in order while different chats
+    run in parallel.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, maxsize: int, lanes: int) -> None:
+        self._dispatcher = dispatcher
+        self._bot = bot
+        self._lane_count = max(1, lanes)
+        self._lane_maxsize = max(1, -(-maxsize // self._lane_count))
+        self._lanes = [_Lane(self._lane_maxsize) for _ in range(self._lane_count)]
+        self._tasks: list[asyncio.Task] = []
+        self._started_at = 0.0
+        self._busy_seconds = 0.0
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._worker(lane), name=f"update-lane-{idx}")
+            for idx, lane in enumerate(self._lanes)
+        ]
+        logger.info(
+            "Update queue started: %s lanes x %s updates",
+            self._lane_count,
+            self._lane_maxsize,
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(lane.queue.join() for lane in self._lanes)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Update queue stopped with %s pending updates", self.depth)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def depth(self) -> int:
+        return sum(lane.queue.qsize() for lane in self._lanes)
+
+    def lane_for(self, update: Update) -> int:
+        return update_chat_key(update) % self._lane_count
+
+    def put_nowait(self, update: Update) -> None:
+        lane = self._lanes[self.lane_for(update)]
+        try:
+            lane.queue.put_nowait((time.monotonic(), update))
+        except asyncio.QueueFull:
+            lane.rejected += 1
+            self._rejected += 1
+            raise UpdateQueueFull("Update lane is full") from None
+
+    async def _worker(self, lane: _Lane) -> None:
+        while True:
+            enqueued_at, update = await lane.queue.get()
+            started = time.monotonic()
+            wait = started - enqueued_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            lane.busy = True
+            try:
+                response = await self._dispatcher.feed_update(self._bot, update)
+                # The webhook has already been answered, so methods returned by
+                # handlers are sent as regular requests.
+                if isinstance(response, TelegramMethod):
+                    await self._dispatcher.silent_call_request(self._bot, response)
+            except Exception:  # noqa: BLE001
+                self._failed += 1
+                logger.exception("Failed to process update %s", update.update_id)
+            finally:
+                lane.busy = False
+                lane.processed += 1
+                self._busy_seconds += time.monotonic() - started
+                self._processed += 1
+                lane.queue.task_done()
+
+    def stats(self) -> dict:
+        uptime = time.monotonic() - self._started_at if self._tasks else 0.0
+        capacity = uptime * self._lane_count
+        return {
+            "running": self.running,
+            "depth": self.depth,
+            "lanes": self._lane_count,
+            "lane_maxsize": self._lane_maxsize,
+            "lane_depths": [lane.queue.qsize() for lane in self._lanes],
+            "lane_rejected": [lane.rejected for lane in self._lanes],
+            "busy_lanes": sum(1 for lane in self._lanes if lane.busy),
+            "utilisation": round(self._busy_seconds / capacity, 4) if capacity else 0.0,
+            "processed": self._processed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "wait_avg_ms": round(self._wait_total / self._processed * 1000, 2)
+            if self._processed
+            else 0.0,
+            "wait_max_ms": round(self._wait_max * 1000, 2),
+        }
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import hashlib
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardMarkup, Message
+
+NOT_MODIFIED = "message is not modified"
+
+
+def summary_digest(text: str, reply_markup: InlineKeyboardMarkup | None) -> str:
+    markup = reply_markup.model_dump_json(exclude_none=True) if reply_markup else ""
+    return hashlib.blake2b(f"{text}\0{markup}".encode(), digest_size=8).hexdigest()
+
+
+async def render_summary(
+    message: Message,
+    state: FSMContext,
+    data: dict,
+    text: str,
+    reply_markup: InlineKeyboardMarkup | None,
+) -> None:
+    """Show the progress summary, editing the chat's existing summary message.
+
+    The digest of the last rendered text and keyboard is kept in the chat's FSM
+    data, so re-rendering an unchanged summary costs no Bot API call.
+    """
+    digest = summary_digest(text, reply_markup)
+    summary_id = data.get("summary_message_id")
+    if summary_id:
+        if data.get("summary_digest") == digest:
+            return
+        try:
+            await message.bot.edit_message_text(
+                text,
+                chat_id=message.chat.id,
+                message_id=summary_id,
+                reply_markup=reply_markup,
+            )
+        except TelegramBadRequest as exc:
+            if NOT_MODIFIED not in exc.message:
+                # The summary message is gone or no longer editable: post a new one.
+                summary_id = None
+        if summary_id:
+            await state.update_data(summary_digest=digest)
+            return
+    sent = await message.answer(text, reply_markup=reply_markup)
+    await state.update_data(summary_message_id=sent.message_id, summary_digest=digest)
@@ -0,0 +1,23 @@
+from typing import Any
+
+from aiogram import Bot
+from aiogram.methods import TelegramMethod
+
+
+def build_webhook_reply(bot: Bot, method: TelegramMethod[Any]) -> bytes | None:
+    """Serialise ``method`` as a webhook response body.
+
+    Telegram executes a method returned in the webhook response without a separate
+    HTTPS request. Methods that upload files need multipart and are not eligible;
+    ``None`` is returned for them so the caller can send them normally.
+    """
+    files: dict[str, Any] = {}
+    payload: dict[str, Any] = {"method": method.__api_method__}
+    for key, value in method.model_dump(warnings=False).items():
+        prepared = bot.session.prepare_value(value, bot=bot, files=files, _dumps_json=False)
+        if prepared is None:
+            continue
+        payload[key] = prepared
+    if files:
+        return None
+    return bot.session.json_dumps(payload).encode()
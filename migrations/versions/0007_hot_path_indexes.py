@@ -0,0 +1,93 @@
+"""add hot path indexes
+
+Revision ID: 0007_hot_path_indexes
+Revises: 0006_add_test_material_type
+Create Date: 2024-01-07 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_hot_path_indexes"
+down_revision = "0006_add_test_material_type"
+branch_labels = None
+depends_on = None
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction, so every statement
+# goes through an autocommit block and does not lock writes on live tables.
+# test_answer_keys needs nothing new: uq_test_key already leads with test_id.
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tests_teacher_created",
+            "tests",
+            ["teacher_id", "created_at", "id"],
+            postgresql_include=["title", "status", "access_code"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_attempts_student_created",
+            "attempts",
+            ["student_id", "created_at", "id"],
+            postgresql_include=["test_id", "status", "score_total"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_attempt_answers_attempt_id",
+            "attempt_answers",
+            ["attempt_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_user_leads_ref_token",
+            "user_leads",
+            ["ref_token", "started_at"],
+            postgresql_where=sa.text("ref_token IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_audit_logs_created_at",
+            "audit_logs",
+            ["created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_users_teacher_created",
+            "users",
+            ["teacher_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_users_teacher_id",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_teacher_id",
+            "users",
+            ["teacher_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table in (
+            ("ix_users_teacher_created", "users"),
+            ("ix_audit_logs_created_at", "audit_logs"),
+            ("ix_user_leads_ref_token", "user_leads"),
+            ("ix_attempt_answers_attempt_id", "attempt_answers"),
+            ("ix_attempts_student_created", "attempts"),
+            ("ix_tests_teacher_created", "tests"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
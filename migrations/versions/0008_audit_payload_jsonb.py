@@ -0,0 +1,37 @@
+"""audit payload jsonb
+
+Revision ID: 0008_audit_payload_jsonb
+Revises: 0007_hot_path_indexes
+Create Date: 2024-01-08 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008_audit_payload_jsonb"
+down_revision = "0007_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "audit_logs",
+        "payload_json",
+        type_=postgresql.JSONB(),
+        existing_type=sa.Text(),
+        existing_nullable=False,
+        postgresql_using="payload_json::jsonb",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "audit_logs",
+        "payload_json",
+        type_=sa.Text(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using="payload_json::text",
+    )
@@ -0,0 +1,43 @@
+"""test item stats
+
+Revision ID: 0009_test_item_stats
+Revises: 0008_audit_payload_jsonb
+Create Date: 2024-01-09 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009_test_item_stats"
+down_revision = "0008_audit_payload_jsonb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "test_item_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("test_id", sa.Integer(), sa.ForeignKey("tests.id"), nullable=False),
+        sa.Column("section_code", sa.String(length=8), nullable=False),
+        sa.Column("item_no", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.SmallInteger(), server_default="0", nullable=False),
+        sa.Column("correct_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("wrong_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("blank_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "option_counts",
+            postgresql.JSONB(),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            "test_id", "section_code", "item_no", "shard", name="uq_test_item_stat"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("test_item_stats")
@@ -0,0 +1,39 @@
+"""attempt score index
+
+Revision ID: 0010_attempt_score_index
+Revises: 0009_test_item_stats
+Create Date: 2024-01-10 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_attempt_score_index"
+down_revision = "0009_test_item_stats"
+branch_labels = None
+depends_on = None
+
+# Built concurrently like 0007. Rebuilding a test's score histogram groups its
+# submitted attempts by score_total, an index-only scan over this index.
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_attempts_test_score",
+            "attempts",
+            ["test_id", "score_total"],
+            postgresql_where=sa.text("status = 'submitted'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_attempts_test_score",
+            table_name="attempts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
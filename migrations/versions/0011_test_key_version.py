@@ -0,0 +1,25 @@
+"""test key version
+
+Revision ID: 0011_test_key_version
+Revises: 0010_attempt_score_index
+Create Date: 2024-01-11 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_test_key_version"
+down_revision = "0010_attempt_score_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tests",
+        sa.Column("key_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tests", "key_version")
@@ -0,0 +1,44 @@
+"""Rebuild ``test_item_stats`` from the stored answers.
+
+Usage: python scripts/rebuild_item_stats.py [test_id ...]
+
+Submits keep the per-item counters up to date from migration 0009 on; run this
+once afterwards to count attempts submitted before it, or any time to check a
+test. Every test with submitted attempts (or only the given ones) is graded
+again with ``rescore_test`` and committed on its own.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select  # noqa: E402
+
+from shared.db.engine import SessionLocal, engine  # noqa: E402
+from shared.models import Attempt, AttemptStatus  # noqa: E402
+from shared.services.rescoring import rescore_test  # noqa: E402
+
+
+async def main(test_ids: list[int]) -> None:
+    async with SessionLocal() as session:
+        if not test_ids:
+            result = await session.execute(
+                select(Attempt.test_id)
+                .where(Attempt.status == AttemptStatus.SUBMITTED)
+                .distinct()
+                .order_by(Attempt.test_id)
+            )
+            test_ids = list(result.scalars().all())
+        for test_id in test_ids:
+            results = await rescore_test(session, test_id)
+            await session.commit()
+            attempts = max((result.attempts for result in results), default=0)
+            updated = sum(result.updated for result in results)
+            print(f"test {test_id}: {attempts} attempts, {updated} score updates")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]]))
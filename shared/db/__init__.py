@@ -1,4 +1,11 @@
-from shared.db.engine import SessionLocal, engine
-from shared.db.session import get_async_session
+from shared.db.engine import SessionLocal, admission, engine, pool_metrics
+from shared.db.session import LazySession, get_async_session
 
-__all__ = ["SessionLocal", "engine", "get_async_session"]
+__all__ = [
+    "LazySession",
+    "SessionLocal",
+    "admission",
+    "engine",
+    "get_async_session",
+    "pool_metrics",
+]
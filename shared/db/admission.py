@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class DbOverloaded(RuntimeError):
+    """Raised when a unit of work is not admitted to the database in time."""
+
+
+class AdmissionController:
+    """Caps concurrent database units of work in front of the connection pool.
+
+    At most ``limit`` holders run at once and at most ``max_waiting`` callers
+    queue behind them. A caller beyond the queue fails immediately, and a queued
+    caller gives up after ``timeout`` seconds, instead of waiting out the pool
+    timeout while holding a handler.
+    """
+
+    def __init__(self, limit: int, max_waiting: int, timeout: float) -> None:
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def acquire(self) -> None:
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            self._admit(0.0)
+            return
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise DbOverloaded("database admission queue is full")
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise DbOverloaded("timed out waiting for database admission") from None
+        finally:
+            self.waiting -= 1
+        self._admit(time.perf_counter() - started)
+
+    def _admit(self, waited: float) -> None:
+        self.active += 1
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.admitted * 1000, 2)
+            if self.admitted
+            else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
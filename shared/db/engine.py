@@ -1,7 +1,27 @@
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
+from shared.db.admission import AdmissionController
+from shared.db.metrics import MeteredQueuePool, pool_metrics
 from shared.settings import get_settings
 
 settings = get_settings()
-engine: AsyncEngine = create_async_engine(settings.database_url, pool_pre_ping=True)
+engine: AsyncEngine = create_async_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    poolclass=MeteredQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+pool_metrics.attach(engine)
+
+# 0 means "one unit of work per pooled connection", so admitted work never
+# queues inside the pool itself.
+admission = AdmissionController(
+    limit=settings.db_admission_limit or settings.db_pool_size + settings.db_max_overflow,
+    max_waiting=settings.db_admission_queue,
+    timeout=settings.db_admission_timeout,
+)
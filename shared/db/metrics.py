@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class UpdateDbUsage:
+    __slots__ = ("checkouts", "hold_seconds", "round_trips")
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.hold_seconds = 0.0
+        self.round_trips = 0
+
+
+_current_usage: ContextVar[UpdateDbUsage | None] = ContextVar("db_update_usage", default=None)
+
+
+class PoolMetrics:
+    """Pool checkout/checkin accounting, aggregated globally and per update."""
+
+    def __init__(self) -> None:
+        self._engine: AsyncEngine | None = None
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_timeouts = 0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+        self.updates = 0
+        self.updates_with_db = 0
+        self.update_hold_total = 0.0
+        self.update_hold_max = 0.0
+        self.round_trips = 0
+        self.update_round_trips_total = 0
+        self.update_round_trips_max = 0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        event.listen(engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(engine.sync_engine, "checkin", self._on_checkin)
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_round_trip)
+        event.listen(engine.sync_engine, "commit", self._on_round_trip)
+        event.listen(engine.sync_engine, "rollback", self._on_round_trip)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        connection_record.info["usage"] = _current_usage.get()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop("checked_out_at", None)
+        usage = connection_record.info.pop("usage", None)
+        if started is None:
+            return
+        held = time.perf_counter() - started
+        self.hold_total += held
+        self.hold_max = max(self.hold_max, held)
+        if usage is not None:
+            usage.checkouts += 1
+            usage.hold_seconds += held
+
+    def _on_round_trip(self, *args) -> None:
+        """Count statements, COMMITs and ROLLBACKs sent to the server."""
+        self.round_trips += 1
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.round_trips += 1
+
+    def record_checkout_wait(self, waited: float, timed_out: bool) -> None:
+        self.checkout_wait_total += waited
+        self.checkout_wait_max = max(self.checkout_wait_max, waited)
+        if timed_out:
+            self.checkout_timeouts += 1
+
+    @contextmanager
+    def track_update(self) -> Iterator[UpdateDbUsage]:
+        usage = UpdateDbUsage()
+        token = _current_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _current_usage.reset(token)
+            self.updates += 1
+            if usage.checkouts:
+                self.updates_with_db += 1
+                self.update_hold_total += usage.hold_seconds
+                self.update_hold_max = max(self.update_hold_max, usage.hold_seconds)
+                self.update_round_trips_total += usage.round_trips
+                self.update_round_trips_max = max(self.update_round_trips_max, usage.round_trips)
+
+    def stats(self) -> dict:
+        pool = self._engine.sync_engine.pool if self._engine is not None else None
+        return {
+            "size": pool.size() if pool is not None else 0,
+            "checked_out": pool.checkedout() if pool is not None else 0,
+            "overflow": max(pool.overflow(), 0) if pool is not None else 0,
+            "checkouts": self.checkouts,
+            "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 2)
+            if self.checkouts
+            else 0.0,
+            "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 2),
+            "checkout_timeouts": self.checkout_timeouts,
+            "hold_avg_ms": round(self.hold_total / self.checkouts * 1000, 2)
+            if self.checkouts
+            else 0.0,
+            "hold_max_ms": round(self.hold_max * 1000, 2),
+            "updates": self.updates,
+            "updates_with_db": self.updates_with_db,
+            "update_hold_avg_ms": round(self.update_hold_total / self.updates_with_db * 1000, 2)
+            if self.updates_with_db
+            else 0.0,
+            "update_hold_max_ms": round(self.update_hold_max * 1000, 2),
+            "round_trips": self.round_trips,
+            "update_round_trips_avg": round(
+                self.update_round_trips_total / self.updates_with_db, 2
+            )
+            if self.updates_with_db
+            else 0.0,
+            "update_round_trips_max": self.update_round_trips_max,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports checkout wait time and timeouts to ``pool_metrics``."""
+
+    def connect(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.record_checkout_wait(time.perf_counter() - started, timed_out)
@@ -1,13 +1,15 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, String, Text, func
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch server-generated columns (timestamps) with RETURNING on INSERT and
+    # UPDATE instead of expiring them, so services never need session.refresh().
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class UserRole(str, enum.Enum):
@@ -56,11 +58,12 @@ class AuditLog(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     actor_telegram_id: Mapped[int | None] = mapped_column(BigInteger)
     event_type: Mapped[str] = mapped_column(String(64))
-    payload_json: Mapped[str] = mapped_column(Text)
+    payload_json: Mapped[dict] = mapped_column(JSONB)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
 
-Index("ix_users_teacher_id", User.teacher_id)
+Index("ix_users_teacher_created", User.teacher_id, User.created_at, User.id)
+Index("ix_audit_logs_created_at", AuditLog.created_at)
 
 
 class UserLead(Base):
@@ -80,3 +83,11 @@ class UserLead(Base):
     created_ip: Mapped[str | None] = mapped_column(String(64))
     user_agent: Mapped[str | None] = mapped_column(String(255))
     metadata_json: Mapped[dict | None] = mapped_column(JSONB)
+
+
+Index(
+    "ix_user_leads_ref_token",
+    UserLead.ref_token,
+    UserLead.started_at,
+    postgresql_where=UserLead.ref_token.isnot(None),
+)
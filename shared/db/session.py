@@ -1,10 +1,91 @@
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from shared.db.engine import SessionLocal
+from shared.db.admission import AdmissionController
+from shared.db.engine import SessionLocal, admission
+from shared.db.unit_of_work import begin_unit_of_work
+
+# AsyncSession methods that may check a connection out of the pool.
+_IO_METHODS = frozenset(
+    {
+        "commit",
+        "connection",
+        "delete",
+        "execute",
+        "flush",
+        "get",
+        "get_one",
+        "merge",
+        "refresh",
+        "run_sync",
+        "scalar",
+        "scalars",
+        "stream",
+        "stream_scalars",
+    }
+)
 
 
 async def get_async_session() -> AsyncIterator[AsyncSession]:
     async with SessionLocal() as session:
         yield session
+
+
+class LazySession:
+    """Stand-in for an ``AsyncSession`` that is only created on first use.
+
+    Updates whose handlers never touch the database skip session setup and
+    teardown entirely. The first call that can reach the database waits for an
+    admission slot (see ``AdmissionController``), which is held until
+    ``close()``; ``DbOverloaded`` propagates from that call when the database is
+    saturated. With ``unit_of_work`` the session is marked so that services only
+    flush and the owner commits once.
+    """
+
+    __slots__ = ("_factory", "_session", "_admission", "_admitted", "_unit_of_work")
+
+    def __init__(
+        self,
+        factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        admission: AdmissionController | None = admission,
+        unit_of_work: bool = False,
+    ) -> None:
+        self._factory = factory
+        self._session: AsyncSession | None = None
+        self._admission = admission
+        self._admitted = False
+        self._unit_of_work = unit_of_work
+
+    @property
+    def materialized(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+            if self._unit_of_work:
+                begin_unit_of_work(self._session)
+        attr = getattr(self._session, name)
+        if name in _IO_METHODS and not self._admitted and self._admission is not None:
+            return self._admit_before(attr)
+        return attr
+
+    def _admit_before(self, method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            if not self._admitted:
+                await self._admission.acquire()
+                self._admitted = True
+            return await method(*args, **kwargs)
+
+        return call
+
+    async def close(self) -> None:
+        try:
+            if self._session is not None:
+                await self._session.close()
+        finally:
+            if self._admitted:
+                self._admitted = False
+                self._admission.release()
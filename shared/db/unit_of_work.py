@@ -0,0 +1,37 @@
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+UNIT_OF_WORK = "unit_of_work"
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def begin_unit_of_work(session: AsyncSession) -> None:
+    """Mark ``session`` as owned by a caller that commits once at the end."""
+    session.info[UNIT_OF_WORK] = True
+
+
+async def commit_or_flush(session: AsyncSession) -> None:
+    """End a service's write: flush inside a unit of work, commit otherwise."""
+    if session.info.get(UNIT_OF_WORK):
+        await session.flush()
+    else:
+        await session.commit()
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's current transaction has committed."""
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
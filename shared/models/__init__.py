@@ -3,6 +3,7 @@ from shared.models.test import Test, TestStatus
 from shared.models.test_answer_key import TestAnswerKey
 from shared.models.attempt import Attempt, AttemptStatus
 from shared.models.attempt_answer import AttemptAnswer
+from shared.models.test_item_stat import TestItemStat
 
 __all__ = [
     "SubjectTemplate",
@@ -12,4 +13,5 @@ __all__ = [
     "Attempt",
     "AttemptStatus",
     "AttemptAnswer",
+    "TestItemStat",
 ]
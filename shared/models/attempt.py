@@ -1,7 +1,16 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -18,6 +27,19 @@ class Attempt(Base):
     __tablename__ = "attempts"
     __table_args__ = (
         UniqueConstraint("test_id", "student_id", name="uq_attempt_test_student"),
+        Index(
+            "ix_attempts_student_created",
+            "student_id",
+            "created_at",
+            "id",
+            postgresql_include=["test_id", "status", "score_total"],
+        ),
+        Index(
+            "ix_attempts_test_score",
+            "test_id",
+            "score_total",
+            postgresql_where=text("status = 'submitted'"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -11,7 +11,7 @@ class AttemptAnswer(Base):
     __tablename__ = "attempt_answers"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    attempt_id: Mapped[int] = mapped_column(ForeignKey("attempts.id"), nullable=False)
+    attempt_id: Mapped[int] = mapped_column(ForeignKey("attempts.id"), nullable=False, index=True)
     section_code: Mapped[str] = mapped_column(String(8), nullable=False)
     payload_json: Mapped[dict] = mapped_column(JSONB, nullable=False)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
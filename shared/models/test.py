@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from shared.db.models import Base
@@ -15,6 +15,15 @@ class TestStatus(str, enum.Enum):
 
 class Test(Base):
     __tablename__ = "tests"
+    __table_args__ = (
+        Index(
+            "ix_tests_teacher_created",
+            "teacher_id",
+            "created_at",
+            "id",
+            postgresql_include=["title", "status", "access_code"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     teacher_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -35,6 +44,8 @@ class Test(Base):
     material_file_type: Mapped[str | None] = mapped_column(String(32))
     material_caption: Mapped[str | None] = mapped_column(String(255))
     access_code: Mapped[str] = mapped_column(String(32), unique=True, nullable=False)
+    # Bumped whenever the answer key changes; submits check it against their plan.
+    key_version: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(), onupdate=func.now()
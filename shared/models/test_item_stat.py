@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Integer, SmallInteger, String, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from shared.db.models import Base
+
+
+class TestItemStat(Base):
+    __tablename__ = "test_item_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "test_id", "section_code", "item_no", "shard", name="uq_test_item_stat"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    test_id: Mapped[int] = mapped_column(ForeignKey("tests.id"), nullable=False)
+    section_code: Mapped[str] = mapped_column(String(8), nullable=False)
+    item_no: Mapped[int] = mapped_column(Integer, nullable=False)
+    shard: Mapped[int] = mapped_column(SmallInteger, nullable=False, server_default="0")
+    correct_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    wrong_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    blank_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    option_counts: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
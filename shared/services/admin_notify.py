@@ -1,21 +1,159 @@
+import asyncio
 import logging
+from collections import Counter
 from datetime import datetime
+from functools import partial
 
 from aiogram import Bot
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.db.models import User, UserLead
+from shared.db.unit_of_work import after_commit, commit_or_flush
 from shared.settings import get_settings
+from shared.utils.outbound import Priority, outbound_priority
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-async def notify_new_lead(bot: Bot, lead: UserLead) -> None:
-    if not settings.admin_ids:
-        return
 
-    message = (
+class AdminNotifier:
+    """Background fan-out of admin notifications.
+
+    Handlers only enqueue a message; ``concurrency`` workers send it to every
+    admin, so the user's update never waits for Bot API calls. Within each
+    ``digest_window`` only the first ``digest_threshold`` new leads are sent one
+    by one; the rest are counted and summarised in a single digest message when
+    the window closes. Workers start on first use.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        maxsize: int = 1000,
+        digest_window: float = 60.0,
+        digest_threshold: int = 5,
+        top_refs: int = 5,
+    ) -> None:
+        self._concurrency = max(1, concurrency)
+        self._queue: asyncio.Queue[tuple[Bot, int, str]] = asyncio.Queue(maxsize=maxsize)
+        self._digest_window = digest_window
+        self._digest_threshold = digest_threshold
+        self._top_refs = top_refs
+        self._tasks: list[asyncio.Task] = []
+        self._bot: Bot | None = None
+        self._window_leads = 0
+        self._digest_refs: Counter[str | None] = Counter()
+        self._sent = 0
+        self._failed = 0
+        self._dropped = 0
+        self._digests = 0
+        self._digested_leads = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def _ensure_started(self, bot: Bot) -> None:
+        self._bot = bot
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"admin-notify-{idx}")
+            for idx in range(self._concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._digest_loop(), name="admin-notify-digest"))
+
+    def submit(self, bot: Bot, text: str) -> None:
+        if not settings.admin_ids:
+            return
+        self._ensure_started(bot)
+        for admin_id in settings.admin_ids:
+            try:
+                self._queue.put_nowait((bot, admin_id, text))
+            except asyncio.QueueFull:
+                self._dropped += 1
+
+    def lead(self, bot: Bot, lead: UserLead) -> None:
+        if not settings.admin_ids:
+            return
+        self._window_leads += 1
+        if self._window_leads <= self._digest_threshold:
+            self.submit(bot, _lead_message(lead))
+        else:
+            self._ensure_started(bot)
+            self._digest_refs[lead.ref_token] += 1
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        if not self._tasks:
+            return
+        self._send_digest()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Admin notifier stopped with %s unsent messages", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        with outbound_priority(Priority.BACKGROUND):
+            while True:
+                bot, admin_id, text = await self._queue.get()
+                try:
+                    await bot.send_message(admin_id, text)
+                    self._sent += 1
+                except Exception:  # noqa: BLE001
+                    self._failed += 1
+                    logger.exception("Failed to notify admin %s", admin_id)
+                finally:
+                    self._queue.task_done()
+
+    async def _digest_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._digest_window)
+            self._send_digest()
+
+    def _send_digest(self) -> None:
+        refs, self._digest_refs = self._digest_refs, Counter()
+        self._window_leads = 0
+        count = sum(refs.values())
+        if not count or self._bot is None:
+            return
+        self._digests += 1
+        self._digested_leads += count
+        ranked = [(ref, n) for ref, n in refs.most_common() if ref is not None]
+        lines = [f"📈 So‘nggi {self._digest_window:g} soniyada yana {count} ta yangi lead"]
+        if ranked:
+            top = ", ".join(f"{ref} ({n})" for ref, n in ranked[: self._top_refs])
+            lines.append(f"Top ref: {top}")
+        if refs[None]:
+            lines.append(f"Ref'siz: {refs[None]}")
+        self.submit(self._bot, "\n".join(lines))
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize(),
+            "sent": self._sent,
+            "failed": self._failed,
+            "dropped": self._dropped,
+            "digests": self._digests,
+            "digested_leads": self._digested_leads,
+            "window_leads": self._window_leads,
+        }
+
+
+admin_notifier = AdminNotifier(
+    concurrency=settings.admin_notify_concurrency,
+    digest_window=settings.admin_lead_digest_seconds,
+    digest_threshold=settings.admin_lead_digest_threshold,
+)
+
+
+def _lead_message(lead: UserLead) -> str:
+    return (
         "🆕 Yangi foydalanuvchi botga kirdi (lead yaratildi)\n"
         f"TG ID: {lead.telegram_id}\n"
         f"Username: {lead.username or '-'}\n"
@@ -25,11 +163,10 @@ async def notify_new_lead(bot: Bot, lead: UserLead) -> None:
         f"Time: {lead.started_at:%Y-%m-%d %H:%M:%S}"
     )
 
-    for admin_id in settings.admin_ids:
-        try:
-            await bot.send_message(admin_id, message)
-        except Exception:  # noqa: BLE001
-            logger.exception("Failed to notify admin %s about lead", admin_id)
+
+def notify_new_lead(bot: Bot, session: AsyncSession, lead: UserLead) -> None:
+    """Announce ``lead`` to the admins once the session's transaction commits."""
+    after_commit(session, partial(admin_notifier.lead, bot, lead))
 
 
 def _display_role(user: User) -> str:
@@ -61,23 +198,16 @@ async def notify_registration_completed(bot: Bot, session: AsyncSession, user: U
         f"Teacher: {teacher_info}"
     )
 
-    for admin_id in settings.admin_ids:
-        try:
-            await bot.send_message(admin_id, message)
-        except Exception:  # noqa: BLE001
-            logger.exception("Failed to notify admin %s about registration", admin_id)
-
-    try:
-        user.registered_notified_at = datetime.utcnow()
-        session.add(user)
-        result = await session.execute(
-            select(UserLead).where(UserLead.telegram_id == user.telegram_id)
-        )
-        lead = result.scalar_one_or_none()
-        if lead and not lead.is_registered:
-            lead.is_registered = True
-            lead.registered_at = datetime.utcnow()
-            session.add(lead)
-        await session.commit()
-    except Exception:  # noqa: BLE001
-        logger.exception("Failed to mark registration notification for %s", user.telegram_id)
+    user.registered_notified_at = datetime.utcnow()
+    session.add(user)
+    result = await session.execute(
+        select(UserLead).where(UserLead.telegram_id == user.telegram_id)
+    )
+    lead = result.scalar_one_or_none()
+    if lead and not lead.is_registered:
+        lead.is_registered = True
+        lead.registered_at = datetime.utcnow()
+        session.add(lead)
+    # Only announce registrations that were actually stored.
+    after_commit(session, partial(admin_notifier.submit, bot, message))
+    await commit_or_flush(session)
@@ -1,21 +1,67 @@
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 
-from sqlalchemy import select
+from sqlalchemy import String, bindparam, exists, func, insert, select, true, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from shared.db.unit_of_work import after_commit, commit_or_flush
 from shared.models.attempt import Attempt, AttemptStatus
 from shared.models.attempt_answer import AttemptAnswer
 from shared.models.test import Test, TestStatus
 from shared.models.test_answer_key import TestAnswerKey
-from shared.services.scoring_service import compute_scores
+from shared.services.item_stats import add_submission
+from shared.services.pagination import Cursor, Page, fetch_page
+from shared.services.score_ranks import (
+    ScoreHistogram,
+    Standing,
+    begin_load,
+    count_score,
+    finish_load,
+    score_ranks,
+)
+from shared.services.scoring_cache import scoring_plans
+from shared.services.scoring_service import SECTIONS, ScoringPlan
+
+
+_histogram_loads: dict[int, asyncio.Future[ScoreHistogram]] = {}
 
 
 class AttemptError(ValueError):
     pass
 
 
+@dataclass(frozen=True)
+class StudentResult:
+    id: int
+    created_at: datetime
+    status: AttemptStatus
+    score_total: int | None
+    test_title: str
+
+
+_SUBMIT_RETURNING = (
+    "id",
+    "status",
+    "submitted_at",
+    "score_total",
+    "score_y1",
+    "score_y2",
+    "score_o",
+    "incorrect_items_json",
+    "updated_at",
+)
+# A submit re-reads the plan once when its key version is stale; the test row
+# stays locked from the first try, so the second one always matches.
+_PLAN_ATTEMPTS = 2
+
+
 async def get_attempt(
     session: AsyncSession, test_id: int, student_id: int
 ) -> Attempt | None:
@@ -30,54 +76,221 @@ async def get_attempt(
 async def start_attempt(
     session: AsyncSession, test: Test, student_id: int
 ) -> Attempt:
+    """Return the student's attempt for ``test``, creating it if needed.
+
+    The insert and the lookup of an existing attempt share one statement. Only
+    when a concurrent insert wins the race (its row is invisible to this
+    statement's snapshot) is a second read needed.
+    """
     if test.status != TestStatus.PUBLISHED:
         raise AttemptError("Test is not published")
 
-    existing = await get_attempt(session, test.id, student_id)
-    if existing:
-        return existing
-
-    attempt = Attempt(test_id=test.id, student_id=student_id, status=AttemptStatus.STARTED)
-    session.add(attempt)
-    await session.commit()
-    await session.refresh(attempt)
+    attempts = Attempt.__table__
+    inserted = (
+        pg_insert(attempts)
+        .values(test_id=test.id, student_id=student_id, status=AttemptStatus.STARTED)
+        .on_conflict_do_nothing(constraint="uq_attempt_test_student")
+        .returning(*attempts.c)
+        .cte("inserted")
+    )
+    existing = select(attempts).where(
+        attempts.c.test_id == test.id,
+        attempts.c.student_id == student_id,
+        ~exists(select(inserted.c.id)),
+    )
+    result = await session.execute(
+        select(Attempt).from_statement(union_all(select(inserted), existing))
+    )
+    attempt = result.scalar_one_or_none()
+    if attempt is None:
+        attempt = await get_attempt(session, test.id, student_id)
+        if attempt is None:
+            raise AttemptError("Attempt could not be started")
+    await commit_or_flush(session)
     return attempt
 
 
+async def _versioned_plan(session: AsyncSession, test_id: int) -> tuple[int, ScoringPlan]:
+    hit, cached = scoring_plans.get(test_id)
+    if hit:
+        return cached
+    generation = scoring_plans.generation
+    result = await session.execute(
+        select(Test.key_version, TestAnswerKey.section_code, TestAnswerKey.payload_json)
+        .join(TestAnswerKey, TestAnswerKey.test_id == Test.id)
+        .where(Test.id == test_id)
+    )
+    rows = result.all()
+    keys = {code: payload for _, code, payload in rows}
+    if not all(code in keys for code in SECTIONS):
+        raise AttemptError("Answer key missing")
+    cached = (rows[0].key_version, ScoringPlan.compile(keys))
+    scoring_plans.put(test_id, cached, generation)
+    return cached
+
+
+async def get_scoring_plan(session: AsyncSession, test_id: int) -> ScoringPlan:
+    """The compiled answer key of ``test_id``, read from the database only on a miss."""
+    _, plan = await _versioned_plan(session, test_id)
+    return plan
+
+
+def _submit_statement(attempt: Attempt, answers: dict, key_version: int, plan: ScoringPlan):
+    scores = plan.score(answers)
+
+    # One statement: the test row is read FOR SHARE (waiting out a key change in
+    # progress, see ``lock_answer_key``), the UPDATE marks the attempt submitted
+    # only once and only if ``plan`` is still the test's current key, and the
+    # INSERT of the answer rows and the item-statistics upsert run for whatever
+    # the UPDATE returned.
+    locked = (
+        select(Test.id, Test.key_version)
+        .where(Test.id == attempt.test_id)
+        .with_for_update(read=True)
+        .cte("locked")
+    )
+    submitted = (
+        update(Attempt)
+        .where(
+            Attempt.id == attempt.id,
+            Attempt.status != AttemptStatus.SUBMITTED,
+            exists(select(locked.c.id).where(locked.c.key_version == key_version)),
+        )
+        .values(
+            status=AttemptStatus.SUBMITTED,
+            submitted_at=datetime.utcnow(),
+            score_total=scores["score_total"],
+            score_y1=scores["score_y1"],
+            score_y2=scores["score_y2"],
+            score_o=scores["score_o"],
+            incorrect_items_json=scores["incorrect_items"],
+        )
+        .returning(
+            Attempt.__table__.c.test_id,
+            *(Attempt.__table__.c[name] for name in _SUBMIT_RETURNING),
+        )
+        .cte("submitted")
+    )
+    rows = (
+        func.unnest(
+            bindparam("section_codes", list(answers), type_=ARRAY(String)),
+            bindparam("payloads", list(answers.values()), type_=ARRAY(JSONB)),
+        )
+        .table_valued("section_code", "payload_json")
+        .render_derived(name="answers")
+    )
+    inserted = (
+        insert(AttemptAnswer)
+        .from_select(
+            ["attempt_id", "section_code", "payload_json"],
+            select(submitted.c.id, rows.c.section_code, rows.c.payload_json).select_from(
+                submitted.join(rows, true())
+            ),
+        )
+        .cte("inserted")
+    )
+    stats = add_submission(submitted, plan.item_results(answers))
+    return (
+        select(locked.c.key_version, *(submitted.c[name] for name in _SUBMIT_RETURNING))
+        .select_from(locked.outerjoin(submitted, true()))
+        .add_cte(locked, submitted, inserted, stats)
+    )
+
+
 async def submit_attempt(
     session: AsyncSession,
     attempt: Attempt,
     answers: dict,
 ) -> Attempt:
-    result = await session.execute(
-        select(TestAnswerKey).where(TestAnswerKey.test_id == attempt.test_id)
-    )
-    keys = {record.section_code: record.payload_json for record in result.scalars().all()}
-    if not all(code in keys for code in ("Y1", "Y2", "O")):
-        raise AttemptError("Answer key missing")
+    for _ in range(_PLAN_ATTEMPTS):
+        key_version, plan = await _versioned_plan(session, attempt.test_id)
+        result = await session.execute(_submit_statement(attempt, answers, key_version, plan))
+        row = result.one_or_none()
+        if row is None:
+            raise AttemptError("Test not found")
+        if row.key_version == key_version:
+            break
+        # The key changed since the plan was cached (here or in another process).
+        scoring_plans.invalidate(attempt.test_id)
+    else:
+        raise AttemptError("Answer key is being changed")
+    if row.id is None:
+        raise AttemptError("Attempt already submitted")
+    for name in _SUBMIT_RETURNING:
+        set_committed_value(attempt, name, row._mapping[name])
+    after_commit(session, partial(count_score, attempt.test_id, attempt.score_total))
+    await commit_or_flush(session)
+    return attempt
 
-    scores = compute_scores(keys, answers)
 
-    attempt.status = AttemptStatus.SUBMITTED
-    attempt.submitted_at = datetime.utcnow()
-    attempt.score_total = scores["score_total"]
-    attempt.score_y1 = scores["score_y1"]
-    attempt.score_y2 = scores["score_y2"]
-    attempt.score_o = scores["score_o"]
-    attempt.incorrect_items_json = scores["incorrect_items"]
-    session.add(attempt)
+async def _load_histogram(session: AsyncSession, test_id: int) -> ScoreHistogram:
+    generation = begin_load(test_id)
+    histogram = None
+    try:
+        plan = await get_scoring_plan(session, test_id)
+        result = await session.execute(
+            select(Attempt.score_total, func.count())
+            .where(
+                Attempt.test_id == test_id,
+                Attempt.status == AttemptStatus.SUBMITTED,
+                Attempt.score_total.is_not(None),
+            )
+            .group_by(Attempt.score_total)
+        )
+        histogram = ScoreHistogram(plan.max_score)
+        for score, count in result.all():
+            histogram.add(score, count)
+    finally:
+        finish_load(test_id, histogram, generation)
+    return histogram
 
-    for code, payload in answers.items():
-        record = AttemptAnswer(attempt_id=attempt.id, section_code=code, payload_json=payload)
-        session.add(record)
 
-    await session.commit()
-    await session.refresh(attempt)
-    return attempt
+async def get_standing(session: AsyncSession, attempt: Attempt) -> Standing:
+    """Rank and percentile of a submitted ``attempt`` among the test's attempts.
+
+    Reads the test's cached score histogram. On a miss it is rebuilt with one
+    grouped count over ``ix_attempts_test_score``; concurrent misses for the
+    same test wait for that one query instead of each running their own. Call
+    it once the submit has committed, so the attempt itself is counted.
+    """
+    hit, histogram = score_ranks.get(attempt.test_id)
+    if not hit:
+        loading = _histogram_loads.get(attempt.test_id)
+        if loading is None:
+            loading = asyncio.ensure_future(_load_histogram(session, attempt.test_id))
+            _histogram_loads[attempt.test_id] = loading
+            loading.add_done_callback(lambda _: _histogram_loads.pop(attempt.test_id, None))
+        histogram = await asyncio.shield(loading)
+    return histogram.standing(attempt.score_total or 0)
 
 
 async def count_attempts_for_test(session: AsyncSession, test_id: int) -> int:
     result = await session.execute(
-        select(Attempt.id).where(Attempt.test_id == test_id)
+        select(func.count()).where(Attempt.test_id == test_id)
+    )
+    return result.scalar_one()
+
+
+async def list_student_results(
+    session: AsyncSession,
+    student_id: int,
+    limit: int,
+    cursor: Cursor | None = None,
+    backward: bool = False,
+) -> Page[StudentResult]:
+    """A page of a student's attempts, newest first."""
+    return await fetch_page(
+        session,
+        select(
+            Attempt.id, Attempt.created_at, Attempt.status, Attempt.score_total, Test.title
+        )
+        .join(Test, Attempt.test_id == Test.id)
+        .where(Attempt.student_id == student_id),
+        Attempt.created_at,
+        Attempt.id,
+        build=lambda row: StudentResult(*row),
+        key=lambda result: Cursor(result.created_at, result.id),
+        limit=limit,
+        cursor=cursor,
+        backward=backward,
     )
-    return len(result.scalars().all())
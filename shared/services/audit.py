@@ -1,19 +1,191 @@
+import asyncio
 import json
-from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+from datetime import datetime
 
+from sqlalchemy import BigInteger, DateTime, String, Text, bindparam, cast, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.db.engine import SessionLocal
 from shared.db.models import AuditLog
+from shared.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DROP = "drop"
+BLOCK = "block"
+
+_Event = tuple[int | None, str, str, datetime]
+
+
+class AuditWriter:
+    """In-memory audit queue written to ``audit_logs`` in batches.
+
+    Callers only serialise the payload and enqueue it; a background task writes
+    up to ``batch_size`` events per statement through its own session, so
+    audits neither add a commit to nor share a failure with the caller's
+    transaction. The queue holds at most ``maxsize`` events. When it is full
+    the ``drop`` policy discards the new event and ``block`` waits up to
+    ``block_timeout`` seconds for room before discarding it. ``stop()`` writes
+    whatever is still queued.
+    """
+
+    def __init__(
+        self,
+        factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        interval: float = 1.0,
+        policy: str = DROP,
+        block_timeout: float = 1.0,
+    ) -> None:
+        if policy not in (DROP, BLOCK):
+            raise ValueError(f"Unknown audit overflow policy: {policy}")
+        self._factory = factory
+        self._queue: asyncio.Queue[_Event] = asyncio.Queue(maxsize=maxsize)
+        self._batch_size = max(1, batch_size)
+        self._interval = interval
+        self._policy = policy
+        self._block_timeout = block_timeout
+        self._flush_now = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+
+    async def log(self, actor_telegram_id: int | None, event_type: str, payload: dict) -> bool:
+        """Queue one event; return ``False`` if it was dropped."""
+        event = (
+            actor_telegram_id,
+            event_type,
+            json.dumps(payload, ensure_ascii=False),
+            datetime.utcnow(),
+        )
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            if self._policy == DROP or self._closing:
+                self._dropped += 1
+                return False
+            try:
+                await asyncio.wait_for(self._queue.put(event), timeout=self._block_timeout)
+            except asyncio.TimeoutError:
+                self._dropped += 1
+                return False
+        self._enqueued += 1
+        if self._queue.qsize() >= self._batch_size:
+            self._flush_now.set()
+        return True
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run(), name="audit-writer")
+
+    async def stop(self) -> None:
+        self._closing = True
+        self._flush_now.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        written = 0
+        while not self._queue.empty():
+            batch = [
+                self._queue.get_nowait()
+                for _ in range(min(self._batch_size, self._queue.qsize()))
+            ]
+            written += await self._write(batch)
+        return written
+
+    async def _write(self, batch: list[_Event]) -> int:
+        actors, event_types, payloads, created = (list(column) for column in zip(*batch))
+        try:
+            async with self._factory() as session:
+                await session.execute(
+                    _BATCH_INSERT,
+                    {
+                        "actors": actors,
+                        "event_types": event_types,
+                        "payloads": payloads,
+                        "created_at": created,
+                    },
+                )
+                await session.commit()
+        except Exception:  # noqa: BLE001
+            self._failed += len(batch)
+            logger.exception("Failed to write %s audit events", len(batch))
+            return 0
+        self._batches += 1
+        self._written += len(batch)
+        return len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "policy": self._policy,
+            "depth": self._queue.qsize(),
+            "maxsize": self._queue.maxsize,
+            "enqueued": self._enqueued,
+            "written": self._written,
+            "dropped": self._dropped,
+            "failed": self._failed,
+            "batches": self._batches,
+        }
+
+
+def _batch_insert():
+    rows = (
+        func.unnest(
+            bindparam("actors", type_=ARRAY(BigInteger)),
+            bindparam("event_types", type_=ARRAY(String)),
+            bindparam("payloads", type_=ARRAY(Text)),
+            bindparam("created_at", type_=ARRAY(DateTime)),
+        )
+        .table_valued("actor_telegram_id", "event_type", "payload", "created_at")
+        .render_derived(name="events")
+    )
+    return pg_insert(AuditLog.__table__).from_select(
+        ["actor_telegram_id", "event_type", "payload_json", "created_at"],
+        select(
+            rows.c.actor_telegram_id,
+            rows.c.event_type,
+            cast(rows.c.payload, JSONB),
+            rows.c.created_at,
+        ),
+    )
+
+
+_BATCH_INSERT = _batch_insert()
+
+audit_writer = AuditWriter(
+    maxsize=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    interval=settings.audit_flush_seconds,
+    policy=settings.audit_overflow_policy,
+    block_timeout=settings.audit_block_timeout,
+)
 
 
 async def log_event(
-    session: AsyncSession,
     actor_telegram_id: int | None,
     event_type: str,
     payload: dict,
-) -> None:
-    record = AuditLog(
-        actor_telegram_id=actor_telegram_id,
-        event_type=event_type,
-        payload_json=json.dumps(payload, ensure_ascii=True),
-    )
-    session.add(record)
-    await session.commit()
+) -> bool:
+    return await audit_writer.log(actor_telegram_id, event_type, payload)
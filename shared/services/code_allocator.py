@@ -0,0 +1,89 @@
+import secrets
+import string
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+HEX_UPPER = string.digits + "ABCDEF"
+URLSAFE = string.ascii_letters + string.digits + "-_"
+
+
+class CodeSpaceExhausted(RuntimeError):
+    pass
+
+
+class CodeAllocator:
+    """Random codes claimed optimistically, widened as their space fills up.
+
+    ``allocate`` hands a fresh candidate to ``claim``, which tries to store it in
+    the same statement that checks it (``INSERT ... ON CONFLICT DO NOTHING`` or a
+    guarded ``UPDATE``) and returns ``None`` when it was taken. Random codes
+    collide with probability close to the occupancy of their space, so the
+    collision rate is tracked per scope; once it passes ``max_load`` the scope
+    moves on to one more character. That keeps the expected number of round
+    trips per allocation constant no matter how many codes exist.
+    """
+
+    def __init__(
+        self,
+        alphabet: str,
+        min_length: int,
+        max_length: int,
+        max_load: float = 0.1,
+        max_attempts: int = 8,
+        smoothing: float = 0.1,
+    ) -> None:
+        self._alphabet = alphabet
+        self._min_length = min_length
+        self._max_length = max_length
+        self._max_load = max_load
+        self._max_attempts = max_attempts
+        self._smoothing = smoothing
+        self._lengths: dict[str, int] = {}
+        self._load: dict[str, float] = {}
+        self._allocations = 0
+        self._collisions = 0
+        self._retried = 0
+        self._widened = 0
+        self._exhausted = 0
+
+    def length(self, scope: str = "") -> int:
+        return self._lengths.get(scope, self._min_length)
+
+    def candidate(self, scope: str = "") -> str:
+        return "".join(secrets.choice(self._alphabet) for _ in range(self.length(scope)))
+
+    async def allocate(self, claim: Callable[[str], Awaitable[T | None]], scope: str = "") -> T:
+        for attempt in range(self._max_attempts):
+            result = await claim(self.candidate(scope))
+            self._observe(scope, collided=result is None)
+            if result is not None:
+                self._allocations += 1
+                if attempt:
+                    self._retried += 1
+                return result
+        self._exhausted += 1
+        raise CodeSpaceExhausted(f"No free code after {self._max_attempts} attempts")
+
+    def _observe(self, scope: str, collided: bool) -> None:
+        load = self._load.get(scope, 0.0)
+        load += self._smoothing * (float(collided) - load)
+        if collided:
+            self._collisions += 1
+        length = self.length(scope)
+        if load > self._max_load and length < self._max_length:
+            self._lengths[scope] = length + 1
+            self._widened += 1
+            load = 0.0
+        self._load[scope] = load
+
+    def stats(self) -> dict:
+        return {
+            "allocations": self._allocations,
+            "collisions": self._collisions,
+            "retried_allocations": self._retried,
+            "widened": self._widened,
+            "exhausted": self._exhausted,
+            "lengths": dict(self._lengths),
+        }
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+
+from sqlalchemy import (
+    Integer,
+    String,
+    Text,
+    and_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.models.test_item_stat import TestItemStat
+from shared.services.scoring_service import BLANK, CORRECT, WRONG
+from shared.settings import get_settings
+
+settings = get_settings()
+
+_COLUMNS = (
+    "test_id",
+    "section_code",
+    "item_no",
+    "shard",
+    "correct_count",
+    "wrong_count",
+    "blank_count",
+    "option_counts",
+)
+
+
+@dataclass(frozen=True)
+class ItemStat:
+    section_code: str
+    item_no: int
+    correct: int
+    wrong: int
+    blank: int
+    options: dict[str, int]
+
+    @property
+    def answered(self) -> int:
+        return self.correct + self.wrong + self.blank
+
+
+# Hand-written because SQLAlchemy 2.0 has no cache key for ON CONFLICT DO
+# UPDATE, so an expression-built upsert would be compiled again on every
+# submit. As text it compiles once per process like the rest of the submit.
+_SUBMISSION_UPSERT = f"""
+INSERT INTO test_item_stats AS counters
+    (test_id, section_code, item_no, shard, correct_count, wrong_count, blank_count,
+     option_counts)
+SELECT submitted.test_id, results.section_code, results.item_no,
+       submitted.id % :stat_shards,
+       (results.outcome = '{CORRECT}')::int,
+       (results.outcome = '{WRONG}')::int,
+       (results.outcome = '{BLANK}')::int,
+       CASE WHEN results.chosen IS NULL THEN jsonb_build_object()
+            ELSE jsonb_build_object(results.chosen, 1) END
+FROM {{submitted}} AS submitted
+CROSS JOIN unnest(:stat_sections, :stat_items, :stat_outcomes, :stat_options)
+    AS results(section_code, item_no, outcome, chosen)
+ON CONFLICT ON CONSTRAINT uq_test_item_stat DO UPDATE SET
+    correct_count = counters.correct_count + excluded.correct_count,
+    wrong_count = counters.wrong_count + excluded.wrong_count,
+    blank_count = counters.blank_count + excluded.blank_count,
+    option_counts = counters.option_counts || (
+        SELECT coalesce(
+            jsonb_object_agg(
+                added.key, coalesce((counters.option_counts ->> added.key)::int, 0)
+                + added.value::int
+            ),
+            jsonb_build_object()
+        )
+        FROM jsonb_each_text(excluded.option_counts) AS added
+    ),
+    updated_at = now()
+"""
+
+
+def add_submission(submitted, results: list[tuple[str, int, str, str | None]]):
+    """CTE adding one submission's ``ScoringPlan.item_results`` to the counters.
+
+    ``submitted`` is a CTE with ``id`` and ``test_id`` columns and must come
+    before this one in the ``WITH`` list; nothing is written unless it returns
+    a row, so the upsert can ride along with the submit UPDATE. Each attempt
+    adds to shard ``id % ITEM_STATS_SHARDS`` of the counters, so concurrent
+    submits of one test mostly lock different rows until they commit. Rows are
+    sent in key order, so submits sharing a shard lock them in the same order.
+    """
+    sections, items, outcomes, options = (list(column) for column in zip(*results))
+    return (
+        text(_SUBMISSION_UPSERT.format(submitted=submitted.name))
+        .bindparams(
+            bindparam("stat_shards", max(1, settings.item_stats_shards), type_=Integer),
+            bindparam("stat_sections", sections, type_=ARRAY(String)),
+            bindparam("stat_items", items, type_=ARRAY(Integer)),
+            bindparam("stat_outcomes", outcomes, type_=ARRAY(String)),
+            bindparam("stat_options", options, type_=ARRAY(String)),
+        )
+        .columns()
+        .cte("item_stats")
+    )
+
+
+def _replace_counts():
+    rows = (
+        func.unnest(
+            bindparam("items", type_=ARRAY(Integer)),
+            bindparam("correct", type_=ARRAY(Integer)),
+            bindparam("wrong", type_=ARRAY(Integer)),
+            bindparam("blank", type_=ARRAY(Integer)),
+            bindparam("options", type_=ARRAY(Text)),
+        )
+        .table_valued("item_no", "correct", "wrong", "blank", "options")
+        .render_derived(name="counts")
+    )
+    stmt = pg_insert(TestItemStat.__table__).from_select(
+        list(_COLUMNS),
+        select(
+            bindparam("test_id", type_=Integer),
+            bindparam("section_code", type_=String),
+            rows.c.item_no,
+            0,
+            rows.c.correct,
+            rows.c.wrong,
+            rows.c.blank,
+            cast(rows.c.options, JSONB),
+        ),
+    )
+    return stmt.on_conflict_do_update(
+        constraint="uq_test_item_stat",
+        set_={
+            "correct_count": stmt.excluded.correct_count,
+            "wrong_count": stmt.excluded.wrong_count,
+            "blank_count": stmt.excluded.blank_count,
+            "option_counts": stmt.excluded.option_counts,
+            "updated_at": func.now(),
+        },
+    )
+
+
+_REPLACE_COUNTS = _replace_counts()
+
+
+async def replace_section_stats(
+    session: AsyncSession,
+    test_id: int,
+    section_code: str,
+    counts: list[tuple[int, int, int, int, dict[str, int]]],
+    keep_only: list[int] | None = None,
+) -> None:
+    """Overwrite the counters of the given ``(item_no, correct, wrong, blank, options)``.
+
+    Used after re-grading: the totals go to shard 0 and the other shards of
+    those items are deleted. With ``keep_only`` the section's rows for any
+    other item (dropped from the key) are deleted too.
+    """
+    stale = and_(
+        TestItemStat.item_no.in_([item_no for item_no, *_ in counts]), TestItemStat.shard != 0
+    )
+    if keep_only is not None:
+        stale = or_(stale, TestItemStat.item_no.not_in(keep_only))
+    await session.execute(
+        delete(TestItemStat).where(
+            TestItemStat.test_id == test_id, TestItemStat.section_code == section_code, stale
+        )
+    )
+    if not counts:
+        return
+    items, correct, wrong, blank, options = (list(column) for column in zip(*counts))
+    await session.execute(
+        _REPLACE_COUNTS,
+        {
+            "test_id": test_id,
+            "section_code": section_code,
+            "items": items,
+            "correct": correct,
+            "wrong": wrong,
+            "blank": blank,
+            "options": [json.dumps(option) for option in options],
+        },
+    )
+
+
+async def get_item_stats(session: AsyncSession, test_id: int) -> list[ItemStat]:
+    """Per-item counters of ``test_id`` in item order, summed over the shards.
+
+    Reads one row per item and shard, however many attempts the test has.
+    """
+    result = await session.execute(
+        select(
+            TestItemStat.section_code,
+            TestItemStat.item_no,
+            TestItemStat.correct_count,
+            TestItemStat.wrong_count,
+            TestItemStat.blank_count,
+            TestItemStat.option_counts,
+        )
+        .where(TestItemStat.test_id == test_id)
+        .order_by(TestItemStat.item_no)
+    )
+    totals: dict[tuple[str, int], list] = {}
+    for section_code, item_no, correct, wrong, blank, options in result.all():
+        entry = totals.setdefault((section_code, item_no), [0, 0, 0, {}])
+        entry[0] += correct
+        entry[1] += wrong
+        entry[2] += blank
+        for option, count in options.items():
+            entry[3][option] = entry[3].get(option, 0) + count
+    return [ItemStat(*key, *entry) for key, entry in totals.items()]
@@ -1,12 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    and_,
+    bindparam,
+    func,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from shared.db.engine import SessionLocal
 from shared.db.models import UserLead
+from shared.db.unit_of_work import commit_or_flush
+from shared.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_PROFILE = ("username", "first_name", "last_name", "language_code")
 
 
 @dataclass
@@ -18,39 +41,175 @@ class TelegramUserInfo:
     language_code: str | None
 
 
+class LeadTouchBuffer:
+    """Write-behind buffer for ``user_leads.last_seen_at``.
+
+    ``/start`` from a known lead with an unchanged profile only records the time
+    here. A background task writes all buffered touches as one batched upsert
+    every ``interval`` seconds, or sooner once ``max_pending`` leads are waiting.
+    Touches are lost only if the process dies between flushes.
+    """
+
+    def __init__(
+        self,
+        factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        interval: float = 5.0,
+        max_pending: int = 5000,
+    ) -> None:
+        self._factory = factory
+        self._interval = interval
+        self._max_pending = max_pending
+        self._pending: dict[int, datetime] = {}
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self._touches = 0
+        self._flushes = 0
+        self._flushed_rows = 0
+        self._failures = 0
+
+    def touch(self, telegram_id: int, seen_at: datetime | None = None) -> None:
+        seen_at = seen_at or datetime.utcnow()
+        previous = self._pending.get(telegram_id)
+        if previous is None or previous < seen_at:
+            self._pending[telegram_id] = seen_at
+        self._touches += 1
+        if len(self._pending) >= self._max_pending:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._flush_loop(), name="lead-touch-flush")
+
+    async def stop(self) -> None:
+        # Let an in-flight flush finish rather than cancelling it mid-commit,
+        # which would lose the batch it already took from ``_pending``.
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with self._factory() as session:
+                await session.execute(
+                    _TOUCH_UPSERT,
+                    {"telegram_ids": list(batch), "seen_at": list(batch.values())},
+                )
+                await session.commit()
+        except Exception:  # noqa: BLE001
+            self._failures += 1
+            logger.exception("Failed to flush %s lead touches", len(batch))
+            for telegram_id, seen_at in batch.items():
+                self.touch(telegram_id, seen_at)
+            return 0
+        self._flushes += 1
+        self._flushed_rows += len(batch)
+        return len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "pending": len(self._pending),
+            "touches": self._touches,
+            "flushes": self._flushes,
+            "flushed_rows": self._flushed_rows,
+            "failures": self._failures,
+        }
+
+
+def _touch_upsert():
+    leads = UserLead.__table__
+    touches = (
+        func.unnest(
+            bindparam("telegram_ids", type_=ARRAY(BigInteger)),
+            bindparam("seen_at", type_=ARRAY(DateTime)),
+        )
+        .table_valued("telegram_id", "seen_at")
+        .render_derived(name="touches")
+    )
+    stmt = pg_insert(leads).from_select(
+        ["telegram_id", "started_at", "last_seen_at"],
+        select(touches.c.telegram_id, touches.c.seen_at, touches.c.seen_at),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[leads.c.telegram_id],
+        set_={"last_seen_at": stmt.excluded.last_seen_at},
+        where=leads.c.last_seen_at < stmt.excluded.last_seen_at,
+    )
+
+
+_TOUCH_UPSERT = _touch_upsert()
+
+lead_touches = LeadTouchBuffer(
+    interval=settings.lead_touch_flush_seconds,
+    max_pending=settings.lead_touch_max_pending,
+)
+
+
 async def create_or_update_lead(
     session: AsyncSession,
     user: TelegramUserInfo,
     ref_token: str | None,
-) -> tuple[UserLead, bool]:
-    result = await session.execute(
-        select(UserLead).where(UserLead.telegram_id == user.telegram_id)
-    )
-    lead = result.scalar_one_or_none()
+) -> tuple[UserLead | None, bool]:
+    """Record a ``/start`` from ``user`` and report whether the lead is new.
 
+    A single ``INSERT ... ON CONFLICT DO UPDATE`` creates the lead or updates a
+    changed profile or referral; ``xmax = 0`` on the returned row tells an
+    insert from an update. When nothing changed the row is left alone, no lead
+    is returned and only ``last_seen_at`` is buffered in ``lead_touches``.
+    """
+    leads = UserLead.__table__
     now = datetime.utcnow()
-    created = False
-    if lead is None:
-        lead = UserLead(
-            telegram_id=user.telegram_id,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            language_code=user.language_code,
-            ref_token=ref_token,
-            started_at=now,
-            last_seen_at=now,
-        )
-        session.add(lead)
-        created = True
-    else:
-        lead.username = user.username
-        lead.first_name = user.first_name
-        lead.last_name = user.last_name
-        lead.language_code = user.language_code
-        lead.ref_token = ref_token or lead.ref_token
-        lead.last_seen_at = now
-
-    await session.commit()
-    await session.refresh(lead)
-    return lead, created
+    stmt = pg_insert(leads).values(
+        telegram_id=user.telegram_id,
+        username=user.username,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        language_code=user.language_code,
+        ref_token=ref_token,
+        started_at=now,
+        last_seen_at=now,
+    )
+    excluded = stmt.excluded
+    changed = or_(
+        tuple_(*(leads.c[name] for name in _PROFILE)).is_distinct_from(
+            tuple_(*(excluded[name] for name in _PROFILE))
+        ),
+        and_(
+            excluded.ref_token.is_not(None),
+            leads.c.ref_token.is_distinct_from(excluded.ref_token),
+        ),
+    )
+    created = literal_column("xmax = 0", Boolean).label("created")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[leads.c.telegram_id],
+        set_={
+            **{name: excluded[name] for name in _PROFILE},
+            "ref_token": func.coalesce(excluded.ref_token, leads.c.ref_token),
+            "last_seen_at": excluded.last_seen_at,
+        },
+        where=changed,
+    ).returning(*leads.c, created)
+
+    row = (await session.execute(select(UserLead, created).from_statement(stmt))).first()
+    if row is None:
+        lead_touches.touch(user.telegram_id, now)
+        return None, False
+    await commit_or_flush(session)
+    return row.UserLead, row.created
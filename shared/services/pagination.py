@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+T = TypeVar("T")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in a ``(created_at, id)`` ordered list."""
+
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        micros = (self.created_at - _EPOCH) // _MICROSECOND
+        return f"{_to_base36(micros)}.{_to_base36(self.id)}"
+
+    @classmethod
+    def decode(cls, raw: str) -> Cursor:
+        micros, _, row_id = raw.partition(".")
+        return cls(_EPOCH + timedelta(microseconds=int(micros, 36)), int(row_id, 36))
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    items: list[T]
+    prev_cursor: Cursor | None
+    next_cursor: Cursor | None
+
+
+def _to_base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        value, rem = divmod(value, 36)
+        out = digits[rem] + out
+        if not value:
+            return out
+
+
+async def fetch_page(
+    session: AsyncSession,
+    stmt: Select,
+    created_at: InstrumentedAttribute,
+    row_id: InstrumentedAttribute,
+    build: Callable[[Any], T],
+    key: Callable[[T], Cursor],
+    limit: int,
+    cursor: Cursor | None = None,
+    backward: bool = False,
+    descending: bool = True,
+) -> Page[T]:
+    """Run ``stmt`` as one keyset page of ``limit`` rows, each passed to ``build``.
+
+    ``cursor`` is the edge row of the page being left: moving forward returns
+    the rows after it, moving ``backward`` the rows before it. One extra row is
+    fetched to know whether another page exists in that direction.
+    """
+    newest_first = descending != backward
+    position = tuple_(created_at, row_id)
+    if cursor is not None:
+        bound = tuple_(cursor.created_at, cursor.id)
+        stmt = stmt.where(position < bound if newest_first else position > bound)
+    if newest_first:
+        stmt = stmt.order_by(created_at.desc(), row_id.desc())
+    else:
+        stmt = stmt.order_by(created_at.asc(), row_id.asc())
+    rows: Sequence[Any] = (await session.execute(stmt.limit(limit + 1))).all()
+
+    more = len(rows) > limit
+    items = [build(row) for row in rows[:limit]]
+    if backward:
+        items.reverse()
+    has_prev = more if backward else cursor is not None
+    has_next = cursor is not None if backward else more
+    return Page(
+        items=items,
+        prev_cursor=key(items[0]) if items and has_prev else None,
+        next_cursor=key(items[-1]) if items and has_next else None,
+    )
@@ -0,0 +1,377 @@
+"""Vectorised re-scoring of submitted attempts after an answer key changes."""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import Integer, Text, and_, bindparam, cast, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from shared.models.attempt import Attempt, AttemptStatus
+from shared.models.attempt_answer import AttemptAnswer
+from shared.models.test import Test
+from shared.models.test_answer_key import TestAnswerKey
+from shared.services.answer_parsing import ValidationError, normalize_number
+from shared.services.item_stats import replace_section_stats
+from shared.services.scoring_service import SECTIONS, ScoringPlan
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = {"Y1": "score_y1", "Y2": "score_y2", "O": "score_o"}
+_EMPTY_KEYS = {code: {} for code in SECTIONS}
+_MISSING = -1
+
+
+@dataclass(frozen=True)
+class RescoreResult:
+    section_code: str
+    attempts: int
+    updated: int
+    changed_items: int
+    delta: bool
+    seconds: float
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """One section of a key: item numbers, answer lookups and expected values per column."""
+
+    items: tuple[int, ...]
+    lookup: tuple
+    expected: tuple[tuple[str, ...], ...]
+    parts: tuple[str, ...]
+
+    @classmethod
+    def compile(cls, code: str, payload: dict) -> _Layout:
+        plan = ScoringPlan.compile({**_EMPTY_KEYS, code: payload})
+        if code == "Y1":
+            return cls(plan.item_numbers, (), tuple((char,) for char in plan.y1_key), ("",))
+        if code == "Y2":
+            return cls(
+                plan.item_numbers,
+                tuple(key for key, _, _ in plan.y2_items),
+                tuple((correct,) for _, _, correct in plan.y2_items),
+                ("",),
+            )
+        return cls(
+            plan.item_numbers,
+            tuple(item_no for item_no, _ in plan.open_items),
+            tuple(expected for _, expected in plan.open_items),
+            plan.open_parts,
+        )
+
+    def same_shape(self, other: _Layout) -> bool:
+        return (
+            len(self.items) == len(other.items)
+            and self.lookup == other.lookup
+            and self.parts == other.parts
+        )
+
+
+class _Cohort:
+    """Answers of every submitted attempt for one section, packed column-wise.
+
+    Y1 and Y2 are ``uint8`` matrices of students x items holding the chosen
+    letter (0 when blank). Open answers are ``int32`` ids of the normalised
+    value per item and part, where ids only exist for values that appear in a
+    key and everything else is ``_MISSING``.
+    """
+
+    def __init__(self, code: str, layout: _Layout, payloads: list[dict], keys: list[_Layout]):
+        self.code = code
+        self._vocab: dict[str, int] = {}
+        if code == "Y1":
+            width = len(layout.items)
+            raw = "".join(
+                str(payload.get("answers", ""))[:width].ljust(width, "\0") for payload in payloads
+            ).encode("ascii", "replace")
+            self.matrix = np.frombuffer(raw, dtype=np.uint8).reshape(len(payloads), width, 1)
+            self.blank = self.matrix[:, :, 0] == 0
+            return
+
+        if code == "Y2":
+            self.matrix = np.zeros((len(payloads), len(layout.items), 1), dtype=np.uint8)
+            for row, payload in enumerate(payloads):
+                answers = payload.get("answers", {})
+                for col, key in enumerate(layout.lookup):
+                    self.matrix[row, col, 0] = _letter(answers.get(key))
+            self.blank = self.matrix[:, :, 0] == 0
+            return
+
+        for key in keys:
+            for expected in key.expected:
+                for value in expected:
+                    self._vocab.setdefault(value, len(self._vocab))
+        self.matrix = np.full(
+            (len(payloads), len(layout.items), len(layout.parts)), _MISSING, dtype=np.int32
+        )
+        self.blank = np.ones((len(payloads), len(layout.items)), dtype=bool)
+        normalised: dict[str, str | None] = {}
+        columns = {item_no: col for col, item_no in enumerate(layout.lookup)}
+        for row, payload in enumerate(payloads):
+            for item in payload.get("items", []):
+                col = columns.get(item.get("item_no"))
+                if col is None or not item:
+                    continue
+                for part_idx, part in enumerate(layout.parts):
+                    raw = str(item.get(part, ""))
+                    if raw.strip():
+                        self.blank[row, col] = False
+                    if raw not in normalised:
+                        try:
+                            normalised[raw] = normalize_number(raw)
+                        except ValidationError:
+                            normalised[raw] = None
+                    self.matrix[row, col, part_idx] = self._vocab.get(normalised[raw], _MISSING)
+
+    def key_vector(self, layout: _Layout) -> np.ndarray:
+        if self.code != "O":
+            return np.array(
+                [[_letter(value)] for (value,) in layout.expected], dtype=np.uint8
+            ).reshape(-1, 1)
+        return np.array(
+            [[self._vocab[value] for value in expected] for expected in layout.expected],
+            dtype=np.int32,
+        ).reshape(len(layout.expected), len(layout.parts))
+
+    def grade(self, layout: _Layout, columns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """``(correct, incorrect)`` boolean matrices of students x ``columns``.
+
+        ``incorrect`` follows ``ScoringPlan.score``: a blank Y1 item is not
+        listed, blank Y2 and open items are.
+        """
+        key = self.key_vector(layout)[columns]
+        correct = (self.matrix[:, columns] == key).all(axis=2)
+        if self.code != "Y1":
+            return correct, ~correct
+        return correct, ~self.blank[:, columns] & ~correct
+
+    def item_counts(
+        self, items: np.ndarray, columns: np.ndarray, correct: np.ndarray
+    ) -> list[tuple[int, int, int, int, dict[str, int]]]:
+        """``(item_no, correct, wrong, blank, options)`` of each graded column."""
+        correct_n = correct.sum(axis=0)
+        blank_n = self.blank[:, columns].sum(axis=0)
+        wrong_n = len(self.matrix) - correct_n - blank_n
+        counts = []
+        for idx, col in enumerate(columns.tolist()):
+            options = {}
+            if self.code != "O":
+                chosen = np.bincount(self.matrix[:, col, 0], minlength=256)
+                options = {chr(code): int(chosen[code]) for code in np.flatnonzero(chosen[1:]) + 1}
+            counts.append(
+                (
+                    int(items[col]),
+                    int(correct_n[idx]),
+                    int(wrong_n[idx]),
+                    int(blank_n[idx]),
+                    options,
+                )
+            )
+        return counts
+
+
+def _letter(value) -> int:
+    """``uint8`` code of a chosen letter: 0 when blank, 255 for anything not a letter."""
+    if not value:
+        return 0
+    if len(value) == 1 and value.isascii():
+        return ord(value)
+    return 255
+
+
+def _update_statement(score_column: str):
+    rows = (
+        func.unnest(
+            bindparam("ids", type_=ARRAY(Integer)),
+            bindparam("totals", type_=ARRAY(Integer)),
+            bindparam("section_scores", type_=ARRAY(Integer)),
+            bindparam("incorrect", type_=ARRAY(Text)),
+        )
+        .table_valued("id", "score_total", "section_score", "incorrect")
+        .render_derived(name="rescored")
+    )
+    attempts = Attempt.__table__
+    return (
+        update(attempts)
+        .where(attempts.c.id == rows.c.id)
+        .values(
+            {
+                attempts.c.score_total: rows.c.score_total,
+                attempts.c[score_column]: rows.c.section_score,
+                attempts.c.incorrect_items_json: cast(rows.c.incorrect, JSONB),
+            }
+        )
+    )
+
+
+_UPDATES = {code: _update_statement(column) for code, column in SCORE_COLUMNS.items()}
+
+
+async def lock_answer_key(session, test_id: int) -> int:
+    """Bump the ``key_version`` of ``test_id`` and return it.
+
+    The row stays locked until the caller's transaction ends. Submits read the
+    row ``FOR SHARE`` and check its version against the plan they scored with,
+    so they wait for a key change to commit and then score with the new key;
+    none can slip in between the re-score's snapshot and the commit.
+    """
+    result = await session.execute(
+        update(Test)
+        .where(Test.id == test_id)
+        .values(key_version=Test.key_version + 1)
+        .returning(Test.key_version)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one()
+
+
+async def rescore_section(
+    session,
+    test_id: int,
+    section_code: str,
+    payload: dict,
+    old_payload: dict | None = None,
+) -> RescoreResult:
+    """Re-score every submitted attempt of ``test_id`` for one section's new key.
+
+    With ``old_payload`` of the same shape only the items whose expected answer
+    changed are graded, and each attempt's stored scores and wrong-item list are
+    adjusted by that delta; otherwise the whole section is graded again. Only
+    attempts whose result changed are written, in one ``UPDATE ... FROM
+    unnest(...)`` statement, and the graded items' ``test_item_stats`` counters
+    are overwritten. The caller holds ``lock_answer_key`` and commits.
+    """
+    started = time.perf_counter()
+    layout = _Layout.compile(section_code, payload)
+    old_layout = _Layout.compile(section_code, old_payload) if old_payload is not None else None
+    delta = old_layout is not None and layout.same_shape(old_layout)
+    if delta:
+        columns = np.array(
+            [
+                col
+                for col, (new, old) in enumerate(zip(layout.expected, old_layout.expected))
+                if new != old
+            ],
+            dtype=np.intp,
+        )
+        if not columns.size:
+            return RescoreResult(section_code, 0, 0, 0, True, time.perf_counter() - started)
+    else:
+        columns = np.arange(len(layout.items), dtype=np.intp)
+
+    score_column = Attempt.__table__.c[SCORE_COLUMNS[section_code]]
+    result = await session.execute(
+        select(
+            Attempt.id,
+            Attempt.score_total,
+            score_column,
+            Attempt.incorrect_items_json,
+            AttemptAnswer.payload_json,
+        )
+        .join(
+            AttemptAnswer,
+            and_(
+                AttemptAnswer.attempt_id == Attempt.id,
+                AttemptAnswer.section_code == section_code,
+            ),
+        )
+        .where(Attempt.test_id == test_id, Attempt.status == AttemptStatus.SUBMITTED)
+    )
+    rows = result.all()
+    if not rows:
+        return RescoreResult(
+            section_code, 0, 0, int(columns.size), delta, time.perf_counter() - started
+        )
+
+    ids, totals, section_scores, incorrect, payloads = (list(column) for column in zip(*rows))
+    cohort = _Cohort(section_code, layout, payloads, [layout, old_layout] if delta else [layout])
+    correct, wrong = cohort.grade(layout, columns)
+    stored = np.array([score or 0 for score in section_scores], dtype=np.int64)
+    if delta:
+        old_correct, old_wrong = cohort.grade(old_layout, columns)
+        new_scores = stored + correct.sum(axis=1) - old_correct.sum(axis=1)
+        touched = (new_scores != stored) | (wrong != old_wrong).any(axis=1)
+    else:
+        new_scores = correct.sum(axis=1)
+        touched = np.ones(len(ids), dtype=bool)
+
+    items = np.array(layout.items, dtype=np.int64)
+    changed_items = set(items[columns].tolist())
+    position = {item_no: idx for idx, item_no in enumerate(layout.items)}
+    touched_rows = np.flatnonzero(touched)
+    update_ids, update_totals, update_scores, update_incorrect = [], [], [], []
+    for row, wrong_items in zip(
+        touched_rows.tolist(), _row_items(wrong[touched_rows], items[columns])
+    ):
+        previous = dict(incorrect[row] or {})
+        section_wrong = previous.get(section_code, []) if delta else []
+        section_wrong = [item for item in section_wrong if item not in changed_items]
+        section_wrong = sorted(section_wrong + wrong_items, key=lambda item: position.get(item, 0))
+        score = int(new_scores[row])
+        if not delta and score == stored[row] and section_wrong == previous.get(section_code):
+            continue
+        previous[section_code] = section_wrong
+        update_ids.append(ids[row])
+        update_totals.append((totals[row] or 0) - int(stored[row]) + score)
+        update_scores.append(score)
+        update_incorrect.append(json.dumps(previous))
+
+    if update_ids:
+        await session.execute(
+            _UPDATES[section_code],
+            {
+                "ids": update_ids,
+                "totals": update_totals,
+                "section_scores": update_scores,
+                "incorrect": update_incorrect,
+            },
+        )
+    await replace_section_stats(
+        session,
+        test_id,
+        section_code,
+        cohort.item_counts(items, columns, correct),
+        keep_only=None if delta else list(layout.items),
+    )
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Re-scored %s attempts of test %s (%s, %s items, %s): %s updated in %.3fs",
+        len(ids),
+        test_id,
+        section_code,
+        columns.size,
+        "delta" if delta else "full",
+        len(update_ids),
+        elapsed,
+    )
+    return RescoreResult(
+        section_code, len(ids), len(update_ids), int(columns.size), delta, elapsed
+    )
+
+
+def _row_items(wrong: np.ndarray, items: np.ndarray) -> list[list[int]]:
+    """Item numbers of the ``True`` cells of each row of ``wrong``."""
+    rows, cols = np.nonzero(wrong)
+    bounds = np.searchsorted(rows, np.arange(1, wrong.shape[0]))
+    return [chunk.tolist() for chunk in np.split(items[cols], bounds)]
+
+
+async def rescore_test(session, test_id: int) -> list[RescoreResult]:
+    """Grade every section of ``test_id`` again from its current key."""
+    await lock_answer_key(session, test_id)
+    result = await session.execute(
+        select(TestAnswerKey.section_code, TestAnswerKey.payload_json).where(
+            TestAnswerKey.test_id == test_id
+        )
+    )
+    keys = dict(result.all())
+    return [
+        await rescore_section(session, test_id, code, keys[code])
+        for code in SECTIONS
+        if code in keys
+    ]
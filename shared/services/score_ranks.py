@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from shared.settings import get_settings
+from shared.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Standing:
+    rank: int
+    total: int
+    percentile: int
+
+
+class ScoreHistogram:
+    """Counts of submitted attempts per total score, ``0..max_score``.
+
+    Scores outside that range (a key edited since) are counted at the nearest
+    end. Lookups walk at most ``max_score`` buckets however many attempts the
+    test has.
+    """
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self, max_score: int) -> None:
+        self.counts = [0] * (max(max_score, 0) + 1)
+        self.total = 0
+
+    def _bucket(self, score: int) -> int:
+        return min(max(score, 0), len(self.counts) - 1)
+
+    def add(self, score: int, count: int = 1) -> None:
+        self.counts[self._bucket(score)] += count
+        self.total += count
+
+    def standing(self, score: int) -> Standing:
+        """Rank among all attempts (ties share a rank) and the share of the
+        other attempts scoring at most ``score``, in percent."""
+        above = sum(self.counts[self._bucket(score) + 1 :])
+        others = self.total - 1
+        percentile = round(100 * (others - above) / others) if others > 0 else 100
+        return Standing(rank=above + 1, total=self.total, percentile=percentile)
+
+
+# ``test_id -> ScoreHistogram``. Built from the database on a miss; afterwards
+# this process's submits add their score once they commit. Submits of other
+# processes only show up once the TTL expires and the histogram is rebuilt.
+score_ranks: TTLCache[int, ScoreHistogram] = TTLCache(
+    settings.score_rank_cache_size, settings.score_rank_ttl_seconds
+)
+
+# Tests whose histogram is being loaded from the database right now.
+_loading: set[int] = set()
+
+
+def begin_load(test_id: int) -> int:
+    """Mark a histogram load for ``test_id`` as started; pass the returned
+    generation to ``finish_load``."""
+    _loading.add(test_id)
+    return score_ranks.generation
+
+
+def finish_load(test_id: int, histogram: ScoreHistogram | None, generation: int) -> None:
+    """Cache a loaded histogram unless a submit committed while it was loading.
+
+    ``None`` means the load failed; it only ends the load.
+    """
+    _loading.discard(test_id)
+    if histogram is not None:
+        score_ranks.put(test_id, histogram, generation)
+
+
+def count_score(test_id: int, score: int) -> None:
+    """Add a committed submit's ``score`` to the test's histogram, if one is cached.
+
+    A load in flight may or may not have seen this submit, so its result is
+    rejected instead and the next lookup rebuilds the histogram.
+    """
+    if test_id in _loading:
+        score_ranks.invalidate(test_id)
+        return
+    histogram = score_ranks.peek(test_id)
+    if histogram is not None:
+        histogram.add(score)
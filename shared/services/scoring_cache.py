@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from shared.settings import get_settings
+from shared.utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from shared.services.scoring_service import ScoringPlan
+
+settings = get_settings()
+
+# ``test_id -> (key_version, plan)``. ``save_section_key`` invalidates a test in
+# this process; a plan cached by another process is caught by the version check
+# in ``submit_attempt``, so the TTL only bounds memory held by idle tests.
+scoring_plans: TTLCache[int, tuple[int, ScoringPlan]] = TTLCache(
+    settings.scoring_plan_cache_size, settings.scoring_plan_ttl_seconds
+)
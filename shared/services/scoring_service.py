@@ -1,83 +1,165 @@
 from __future__ import annotations
 
-from shared.services.answer_key_service import normalize_number
+from dataclasses import dataclass
+
+from shared.services.answer_parsing import normalize_number
+
+SECTIONS = ("Y1", "Y2", "O")
+CORRECT = "correct"
+WRONG = "wrong"
+BLANK = "blank"
 
 
 class ScoringError(ValueError):
     pass
 
 
-def score_y1(key_payload: dict, answer_payload: dict) -> tuple[int, list[int]]:
-    key = key_payload.get("answers", "")
-    ans = answer_payload.get("answers", "")
-    wrong = []
-    score = 0
-    for idx, (k, a) in enumerate(zip(key, ans), start=1):
-        if k == a:
-            score += 1
-        else:
-            wrong.append(idx)
-    return score, wrong
-
-
-def score_y2(key_payload: dict, answer_payload: dict) -> tuple[int, list[int]]:
-    key_answers = key_payload.get("answers", {})
-    ans_answers = answer_payload.get("answers", {})
-    wrong = []
-    score = 0
-    for item_no, correct in key_answers.items():
-        if ans_answers.get(str(item_no)) == correct:
-            score += 1
-        else:
-            wrong.append(int(item_no))
-    return score, wrong
-
-
-def score_open(key_payload: dict, answer_payload: dict) -> tuple[int, list[int]]:
-    key_items = key_payload.get("items", [])
-    ans_items = answer_payload.get("items", [])
-    ans_map = {item.get("item_no"): item for item in ans_items}
-    wrong = []
-    score = 0
-    subparts = key_payload.get("subparts", False)
-    for item in key_items:
-        item_no = item.get("item_no")
-        answer = ans_map.get(item_no)
-        if not answer:
-            wrong.append(item_no)
-            continue
-        if subparts:
-            correct = True
-            for part in ("a", "b"):
-                if normalize_number(str(answer.get(part, ""))) != normalize_number(
-                    str(item.get(part, ""))
-                ):
-                    correct = False
-                    break
-            if correct:
+@dataclass(frozen=True, slots=True)
+class ScoringPlan:
+    """A test's answer key compiled once for scoring many submissions.
+
+    Key values are normalised up front, so scoring only normalises the student's
+    side. ``item_numbers`` lists every scored item in section order and
+    ``sections`` holds each section's ``(code, start, stop)`` slice of it.
+    """
+
+    y1_key: str
+    y2_items: tuple[tuple[str, int, str], ...]
+    open_parts: tuple[str, ...]
+    open_items: tuple[tuple[int, tuple[str, ...]], ...]
+    item_numbers: tuple[int, ...]
+    sections: tuple[tuple[str, int, int], ...]
+
+    @classmethod
+    def compile(cls, keys: dict[str, dict]) -> ScoringPlan:
+        y1_key = keys["Y1"].get("answers", "")
+        y2_items = tuple(
+            (str(item_no), int(item_no), correct)
+            for item_no, correct in keys["Y2"].get("answers", {}).items()
+        )
+        open_key = keys["O"]
+        open_parts = ("a", "b") if open_key.get("subparts", False) else ("answer",)
+        open_items = tuple(
+            (
+                item.get("item_no"),
+                tuple(normalize_number(str(item.get(part, ""))) for part in open_parts),
+            )
+            for item in open_key.get("items", [])
+        )
+
+        numbers = {
+            "Y1": tuple(range(1, len(y1_key) + 1)),
+            "Y2": tuple(item_no for _, item_no, _ in y2_items),
+            "O": tuple(item_no for item_no, _ in open_items),
+        }
+        sections = []
+        start = 0
+        for code in SECTIONS:
+            sections.append((code, start, start + len(numbers[code])))
+            start += len(numbers[code])
+        return cls(
+            y1_key=y1_key,
+            y2_items=y2_items,
+            open_parts=open_parts,
+            open_items=open_items,
+            item_numbers=sum((numbers[code] for code in SECTIONS), ()),
+            sections=tuple(sections),
+        )
+
+    @property
+    def max_score(self) -> int:
+        return len(self.item_numbers)
+
+    def score_y1(self, answer_payload: dict) -> tuple[int, list[int]]:
+        ans = answer_payload.get("answers", "")
+        wrong = []
+        score = 0
+        for idx, (k, a) in enumerate(zip(self.y1_key, ans), start=1):
+            if k == a:
+                score += 1
+            else:
+                wrong.append(idx)
+        return score, wrong
+
+    def score_y2(self, answer_payload: dict) -> tuple[int, list[int]]:
+        ans_answers = answer_payload.get("answers", {})
+        wrong = []
+        score = 0
+        for key, item_no, correct in self.y2_items:
+            if ans_answers.get(key) == correct:
                 score += 1
             else:
                 wrong.append(item_no)
-        else:
-            if normalize_number(str(answer.get("answer", ""))) == normalize_number(
-                str(item.get("answer", ""))
+        return score, wrong
+
+    def score_open(self, answer_payload: dict) -> tuple[int, list[int]]:
+        ans_map = {item.get("item_no"): item for item in answer_payload.get("items", [])}
+        wrong = []
+        score = 0
+        for item_no, expected in self.open_items:
+            answer = ans_map.get(item_no)
+            if answer and all(
+                normalize_number(str(answer.get(part, ""))) == value
+                for part, value in zip(self.open_parts, expected)
             ):
                 score += 1
             else:
                 wrong.append(item_no)
-    return score, wrong
+        return score, wrong
+
+    def item_results(self, answers: dict) -> list[tuple[str, int, str, str | None]]:
+        """``(section, item_no, outcome, chosen option)`` for every item of the key.
+
+        ``outcome`` is ``correct``, ``wrong`` or ``blank``; unlike ``score`` a
+        blank item is not counted as wrong. Only Y1/Y2 items have an option.
+        """
+        results = []
+        y1 = answers["Y1"].get("answers", "")
+        for idx, key in enumerate(self.y1_key):
+            if idx >= len(y1):
+                results.append(("Y1", idx + 1, BLANK, None))
+            else:
+                results.append(("Y1", idx + 1, CORRECT if y1[idx] == key else WRONG, y1[idx]))
+
+        y2 = answers["Y2"].get("answers", {})
+        for key, item_no, correct in self.y2_items:
+            chosen = y2.get(key)
+            if not chosen:
+                results.append(("Y2", item_no, BLANK, None))
+            else:
+                results.append(("Y2", item_no, CORRECT if chosen == correct else WRONG, chosen))
+
+        ans_map = {item.get("item_no"): item for item in answers["O"].get("items", [])}
+        for item_no, expected in self.open_items:
+            answer = ans_map.get(item_no)
+            if not answer or not any(
+                str(answer.get(part, "")).strip() for part in self.open_parts
+            ):
+                outcome = BLANK
+            elif all(
+                normalize_number(str(answer.get(part, ""))) == value
+                for part, value in zip(self.open_parts, expected)
+            ):
+                outcome = CORRECT
+            else:
+                outcome = WRONG
+            results.append(("O", item_no, outcome, None))
+        return results
+
+    def score(self, answers: dict) -> dict:
+        y1_score, y1_wrong = self.score_y1(answers["Y1"])
+        y2_score, y2_wrong = self.score_y2(answers["Y2"])
+        o_score, o_wrong = self.score_open(answers["O"])
+
+        total = y1_score + y2_score + o_score
+        return {
+            "score_total": total,
+            "score_y1": y1_score,
+            "score_y2": y2_score,
+            "score_o": o_score,
+            "incorrect_items": {"Y1": y1_wrong, "Y2": y2_wrong, "O": o_wrong},
+        }
 
 
 def compute_scores(keys: dict, answers: dict) -> dict:
-    y1_score, y1_wrong = score_y1(keys["Y1"], answers["Y1"])
-    y2_score, y2_wrong = score_y2(keys["Y2"], answers["Y2"])
-    o_score, o_wrong = score_open(keys["O"], answers["O"])
-
-    total = y1_score + y2_score + o_score
-    return {
-        "score_total": total,
-        "score_y1": y1_score,
-        "score_y2": y2_score,
-        "score_o": o_score,
-        "incorrect_items": {"Y1": y1_wrong, "Y2": y2_wrong, "O": o_wrong},
-    }
+    return ScoringPlan.compile(keys).score(answers)
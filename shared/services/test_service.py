@@ -1,24 +1,30 @@
-import secrets
+from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from shared.db.unit_of_work import commit_or_flush
+from shared.models.attempt import Attempt
 from shared.models.test import Test, TestStatus
 from shared.models.test_answer_key import TestAnswerKey
 from shared.models.subject_template import SubjectTemplate
+from shared.services.code_allocator import HEX_UPPER, CodeAllocator
+from shared.services.pagination import Cursor, Page, fetch_page
 
 
-async def _generate_access_code(
-    session: AsyncSession, subject_code: str
-) -> str:
-    prefix = subject_code.upper()
-    while True:
-        suffix = secrets.token_hex(2).upper()
-        code = f"{prefix}-{suffix}"
-        result = await session.execute(select(Test.id).where(Test.access_code == code))
-        if result.scalar_one_or_none() is None:
-            return code
+@dataclass(frozen=True)
+class TestSummary:
+    id: int
+    title: str
+    status: TestStatus
+    access_code: str
+    created_at: datetime
+    attempts: int
+
+
+test_codes = CodeAllocator(HEX_UPPER, min_length=4, max_length=12)
 
 
 async def create_test(
@@ -27,18 +33,34 @@ async def create_test(
     template: SubjectTemplate,
     title: str,
 ) -> Test:
-    access_code = await _generate_access_code(session, template.subject_code)
-    test = Test(
-        teacher_id=teacher_id,
-        subject_template_id=template.id,
-        title=title,
-        status=TestStatus.DRAFT,
-        time_limit_minutes=template.structure_json.get("total_time_minutes"),
-        access_code=access_code,
-    )
-    session.add(test)
-    await session.commit()
-    await session.refresh(test)
+    """Insert a draft test under a fresh ``<SUBJECT>-<suffix>`` access code.
+
+    Each candidate code is tried with ``INSERT ... ON CONFLICT DO NOTHING``, so
+    a taken code costs one more statement instead of an aborted transaction.
+    """
+    tests = Test.__table__
+    prefix = template.subject_code.upper()
+    values = {
+        "teacher_id": teacher_id,
+        "subject_template_id": template.id,
+        "title": title,
+        "status": TestStatus.DRAFT,
+        "time_limit_minutes": template.structure_json.get("total_time_minutes"),
+    }
+
+    async def claim(suffix: str) -> Test | None:
+        result = await session.execute(
+            select(Test).from_statement(
+                pg_insert(tests)
+                .values(**values, access_code=f"{prefix}-{suffix}")
+                .on_conflict_do_nothing(index_elements=[tests.c.access_code])
+                .returning(*tests.c)
+            )
+        )
+        return result.scalar_one_or_none()
+
+    test = await test_codes.allocate(claim, scope=prefix)
+    await commit_or_flush(session)
     return test
 
 
@@ -53,8 +75,7 @@ async def update_material(
     test.material_file_type = file_type
     test.material_caption = caption
     session.add(test)
-    await session.commit()
-    await session.refresh(test)
+    await commit_or_flush(session)
     return test
 
 
@@ -62,8 +83,7 @@ async def publish_test(session: AsyncSession, test: Test) -> Test:
     test.status = TestStatus.PUBLISHED
     test.published_at = datetime.utcnow()
     session.add(test)
-    await session.commit()
-    await session.refresh(test)
+    await commit_or_flush(session)
     return test
 
 
@@ -71,8 +91,7 @@ async def close_test(session: AsyncSession, test: Test) -> Test:
     test.status = TestStatus.CLOSED
     test.closed_at = datetime.utcnow()
     session.add(test)
-    await session.commit()
-    await session.refresh(test)
+    await commit_or_flush(session)
     return test
 
 
@@ -95,11 +114,40 @@ async def list_teacher_tests(session: AsyncSession, teacher_id: int) -> list[Tes
     return list(result.scalars().all())
 
 
+async def list_teacher_test_summaries(
+    session: AsyncSession,
+    teacher_id: int,
+    limit: int,
+    cursor: Cursor | None = None,
+    backward: bool = False,
+) -> Page[TestSummary]:
+    """A page of a teacher's tests, newest first, with attempt counts, in one query."""
+    attempts = (
+        select(func.count())
+        .where(Attempt.test_id == Test.id)
+        .correlate(Test)
+        .scalar_subquery()
+    )
+    return await fetch_page(
+        session,
+        select(
+            Test.id, Test.title, Test.status, Test.access_code, Test.created_at, attempts
+        ).where(Test.teacher_id == teacher_id),
+        Test.created_at,
+        Test.id,
+        build=lambda row: TestSummary(*row),
+        key=lambda test: Cursor(test.created_at, test.id),
+        limit=limit,
+        cursor=cursor,
+        backward=backward,
+    )
+
+
 async def count_keys(session: AsyncSession, test_id: int) -> int:
     result = await session.execute(
-        select(TestAnswerKey.id).where(TestAnswerKey.test_id == test_id)
+        select(func.count()).where(TestAnswerKey.test_id == test_id)
     )
-    return len(result.scalars().all())
+    return result.scalar_one()
 
 
 async def get_keys(session: AsyncSession, test_id: int) -> list[TestAnswerKey]:
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from shared.db.models import User, UserRole, UserStatus
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Immutable copy of the ``users`` row, safe to share between sessions."""
+
+    id: int
+    telegram_id: int
+    role: UserRole
+    status: UserStatus
+    name: str
+    phone: str
+    teacher_id: int | None
+    teacher_ref_token: str | None
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> UserSnapshot:
+        return cls(
+            id=user.id,
+            telegram_id=user.telegram_id,
+            role=user.role,
+            status=user.status,
+            name=user.name,
+            phone=user.phone,
+            teacher_id=user.teacher_id,
+            teacher_ref_token=user.teacher_ref_token,
+            created_at=user.created_at,
+        )
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == UserStatus.ACTIVE
+
@@ -1,10 +1,25 @@
-import secrets
-from collections.abc import Sequence
+from functools import partial
 
-from sqlalchemy import select
+from sqlalchemy import exists, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
 from shared.db.models import User, UserRole, UserStatus
+from shared.db.unit_of_work import after_commit, commit_or_flush
+from shared.services.code_allocator import URLSAFE, CodeAllocator
+from shared.services.pagination import Cursor, Page, fetch_page
+from shared.services.user_cache import UserSnapshot
+from shared.settings import get_settings
+from shared.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+# Unknown users are cached as ``None`` too, so unregistered chats do not hit the
+# database on every message.
+user_cache: TTLCache[int, UserSnapshot | None] = TTLCache(
+    settings.user_cache_size, settings.user_cache_ttl_seconds
+)
+ref_tokens = CodeAllocator(URLSAFE, min_length=11, max_length=32)
 
 
 async def get_user_by_telegram_id(session: AsyncSession, telegram_id: int) -> User | None:
@@ -12,6 +27,18 @@ async def get_user_by_telegram_id(session: AsyncSession, telegram_id: int) -> Us
     return result.scalar_one_or_none()
 
 
+async def resolve_user(session: AsyncSession, telegram_id: int) -> UserSnapshot | None:
+    """Return the cached snapshot of the user, loading it on a miss."""
+    hit, snapshot = user_cache.get(telegram_id)
+    if hit:
+        return snapshot
+    generation = user_cache.generation
+    user = await get_user_by_telegram_id(session, telegram_id)
+    snapshot = UserSnapshot.from_user(user) if user else None
+    user_cache.put(telegram_id, snapshot, generation)
+    return snapshot
+
+
 async def get_user_by_id(session: AsyncSession, user_id: int) -> User | None:
     result = await session.execute(select(User).where(User.id == user_id))
     return result.scalar_one_or_none()
@@ -48,8 +75,8 @@ async def create_user(
         status=UserStatus.ACTIVE,
     )
     session.add(user)
-    await session.commit()
-    await session.refresh(user)
+    after_commit(session, partial(user_cache.invalidate, telegram_id))
+    await commit_or_flush(session)
     return user
 
 
@@ -87,8 +114,8 @@ async def update_user_pending(
             user.teacher_ref_token = teacher_ref_token
         user.status = UserStatus.PENDING
 
-    await session.commit()
-    await session.refresh(user)
+    after_commit(session, partial(user_cache.invalidate, telegram_id))
+    await commit_or_flush(session)
     return user
 
 
@@ -122,21 +149,48 @@ async def activate_user(
             user.teacher_ref_token = teacher_ref_token
         user.status = UserStatus.ACTIVE
 
-    await session.commit()
-    await session.refresh(user)
+    if role == UserRole.TEACHER and user.teacher_ref_token is None:
+        await session.flush()
+        await _claim_teacher_ref_token(session, user)
+    after_commit(session, partial(user_cache.invalidate, telegram_id))
+    await commit_or_flush(session)
     return user
 
 
-async def list_teacher_students(session: AsyncSession, teacher_id: int) -> Sequence[User]:
-    result = await session.execute(
-        select(User).where(User.teacher_id == teacher_id).order_by(User.created_at)
-    )
-    return result.scalars().all()
+async def _claim_teacher_ref_token(session: AsyncSession, user: User) -> None:
+    """Give ``user`` a fresh referral token with one guarded UPDATE per candidate."""
+    other = aliased(User)
 
+    async def claim(token: str) -> str | None:
+        result = await session.execute(
+            update(User)
+            .where(User.id == user.id, ~exists().where(other.teacher_ref_token == token))
+            .values(teacher_ref_token=token)
+            .returning(User.teacher_ref_token)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    set_committed_value(user, "teacher_ref_token", await ref_tokens.allocate(claim))
+
+
+async def list_teacher_students(
+    session: AsyncSession,
+    teacher_id: int,
+    limit: int,
+    cursor: Cursor | None = None,
+    backward: bool = False,
+) -> Page[User]:
+    return await fetch_page(
+        session,
+        select(User).where(User.teacher_id == teacher_id),
+        User.created_at,
+        User.id,
+        build=lambda row: row[0],
+        key=lambda user: Cursor(user.created_at, user.id),
+        limit=limit,
+        cursor=cursor,
+        backward=backward,
+        descending=False,
+    )
 
-async def ensure_unique_teacher_token(session: AsyncSession) -> str:
-    while True:
-        token = secrets.token_urlsafe(8)
-        existing = await get_teacher_by_ref_token(session, token)
-        if existing is None:
-            return token
@@ -10,9 +10,44 @@ class Settings(BaseSettings):
     webhook_host: str = ""
     webhook_path: str = "/tg/webhook"
     webhook_secret_token: str
+    metrics_token: str = ""
     admin_telegram_ids: str = ""
     app_env: str = "dev"
     ngrok_authtoken: str = ""
+    webhook_mode: str = "inline"
+    webhook_reply_in_body: bool = False
+    update_queue_size: int = 1000
+    update_lanes: int = 8
+    update_dedup_size: int = 10000
+    update_dedup_max_age_seconds: float = 600.0
+    outbound_global_rate: float = 30.0
+    outbound_chat_rate: float = 1.0
+    outbound_chat_burst: float = 3.0
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: float = 60.0
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_admission_limit: int = 0
+    db_admission_queue: int = 100
+    db_admission_timeout: float = 5.0
+    db_unit_of_work: bool = True
+    lead_touch_flush_seconds: float = 5.0
+    lead_touch_max_pending: int = 5000
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_seconds: float = 1.0
+    audit_overflow_policy: str = "drop"
+    audit_block_timeout: float = 1.0
+    admin_notify_concurrency: int = 4
+    admin_lead_digest_seconds: float = 60.0
+    admin_lead_digest_threshold: int = 5
+    scoring_plan_cache_size: int = 1000
+    scoring_plan_ttl_seconds: float = 3600.0
+    item_stats_shards: int = 8
+    score_rank_cache_size: int = 1000
+    score_rank_ttl_seconds: float = 60.0
 
     @property
     def admin_ids(self) -> set[int]:
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(enum.IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Priority] = ContextVar("outbound_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def outbound_priority(priority: Priority) -> Iterator[None]:
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = 0.0
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def pause(self, until: float) -> None:
+        self.paused_until = max(self.paused_until, until)
+        self.tokens = 0.0
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.paused_until
+
+
+class _MethodStats:
+    __slots__ = ("calls", "total", "max", "retry_after")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.retry_after = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "avg_ms": round(self.total / self.calls * 1000, 2) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+            "retry_after": self.retry_after,
+        }
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """Bot session middleware that paces chat-bound Bot API calls.
+
+    Calls carrying a ``chat_id`` take a token from a per-chat bucket and then
+    from the global bucket. Waiters for the global bucket are served by
+    priority, so interactive replies overtake background notifications.
+    ``RetryAfter`` responses pause the chat's bucket (or delay a chat-less call)
+    and the call is retried.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: float,
+        max_retries: int = 3,
+        max_chat_buckets: int = 10000,
+    ) -> None:
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._chats: dict[Any, TokenBucket] = {}
+        self._max_chat_buckets = max_chat_buckets
+        self._max_retries = max_retries
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump_task: asyncio.Task | None = None
+        self._methods: dict[str, _MethodStats] = {}
+        self._queued = [0, 0]
+
+    def _chat_bucket(self, chat_id: Any, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self._max_chat_buckets:
+                self._chats = {
+                    key: value for key, value in self._chats.items() if not value.idle(now)
+                }
+            bucket = TokenBucket(self._chat_rate, self._chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def _acquire_chat(self, chat_id: Any) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            delay = self._chat_bucket(chat_id, now).reserve(now)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    async def _acquire_global(self, priority: Priority) -> None:
+        loop = asyncio.get_running_loop()
+        if not self._waiting and not self._global.reserve(loop.time()):
+            return
+        waiter = loop.create_future()
+        heapq.heappush(self._waiting, (priority, next(self._seq), waiter))
+        self._queued[priority] += 1
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        try:
+            await waiter
+        finally:
+            self._queued[priority] -= 1
+
+    async def _pump(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._waiting:
+            waiter = self._waiting[0][2]
+            if waiter.done():
+                heapq.heappop(self._waiting)
+                continue
+            delay = self._global.reserve(loop.time())
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(self._waiting)
+            waiter.set_result(None)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        stats = self._methods.setdefault(method.__api_method__, _MethodStats())
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            if chat_id is not None:
+                await self._acquire_chat(chat_id)
+                await self._acquire_global(_priority.get())
+            started = loop.time()
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                stats.retry_after += 1
+                attempt += 1
+                if attempt > self._max_retries:
+                    raise
+                retry_after = exc.retry_after
+            finally:
+                elapsed = loop.time() - started
+                stats.calls += 1
+                stats.total += elapsed
+                stats.max = max(stats.max, elapsed)
+
+            logger.warning(
+                "Flood control on %s (chat %s), retrying in %ss",
+                method.__api_method__,
+                chat_id,
+                retry_after,
+            )
+            if chat_id is not None:
+                self._chat_bucket(chat_id, loop.time()).pause(loop.time() + retry_after)
+            else:
+                await asyncio.sleep(retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "chat_buckets": len(self._chats),
+            "waiting_interactive": self._queued[Priority.INTERACTIVE],
+            "waiting_background": self._queued[Priority.BACKGROUND],
+            "methods": {name: item.as_dict() for name, item in self._methods.items()},
+        }
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU of ``key -> value`` where every entry expires after ``ttl`` seconds.
+
+    ``get`` reports a hit separately from the value, so ``None`` can be cached
+    too. Writers call ``invalidate`` once their change is committed; a reader
+    takes ``generation`` before loading and passes it to ``put``, which skips
+    storing a value loaded before a concurrent invalidation.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _live(self, key: K) -> tuple[float, V] | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, key: K) -> tuple[bool, V | None]:
+        entry = self._live(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def peek(self, key: K) -> V | None:
+        """The cached value, without counting a lookup or refreshing its LRU slot."""
+        entry = self._live(key)
+        return None if entry is None else entry[1]
+
+    def put(self, key: K, value: V, generation: int) -> None:
+        if generation != self.generation or self._maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self.generation += 1
+        self.invalidations += 1
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self._maxsize,
+            "ttl_seconds": self._ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from shared.services.code_allocator import HEX_UPPER, CodeAllocator, CodeSpaceExhausted
+
+
+def claimer(outcomes):
+    """A ``claim`` that records candidates and collides while ``outcomes`` says so."""
+    seen = []
+    outcomes = iter(outcomes)
+
+    async def claim(code):
+        seen.append(code)
+        return code if next(outcomes, True) else None
+
+    return claim, seen
+
+
+def allocate(allocator, claim, scope=""):
+    return asyncio.run(allocator.allocate(claim, scope))
+
+
+def test_candidates_use_the_alphabet_and_current_length():
+    allocator = CodeAllocator(HEX_UPPER, min_length=4, max_length=8)
+    code = allocate(allocator, claimer([True])[0])
+    assert len(code) == 4
+    assert set(code) <= set(HEX_UPPER)
+    assert allocator.stats()["allocations"] == 1
+
+
+def test_single_collision_retries_without_widening():
+    allocator = CodeAllocator(HEX_UPPER, min_length=4, max_length=8)
+    claim, seen = claimer([False, True])
+    allocate(allocator, claim)
+    # One collision brings the average to exactly max_load, which is not over it.
+    assert [len(code) for code in seen] == [4, 4]
+    assert allocator.length() == 4
+    stats = allocator.stats()
+    assert stats["collisions"] == 1
+    assert stats["retried_allocations"] == 1
+    assert stats["widened"] == 0
+
+
+def test_repeated_collisions_widen_the_scope():
+    allocator = CodeAllocator(HEX_UPPER, min_length=4, max_length=8)
+    claim, seen = claimer([False, False, True])
+    allocate(allocator, claim)
+    # 0.1 after the first collision, 0.19 after the second: widen and reset.
+    assert [len(code) for code in seen] == [4, 4, 5]
+    assert allocator.length() == 5
+    assert allocator.stats()["widened"] == 1
+    assert allocator.stats()["lengths"] == {"": 5}
+
+
+def test_rare_collisions_never_widen():
+    allocator = CodeAllocator(HEX_UPPER, min_length=4, max_length=8, smoothing=0.02)
+    # A 2% collision rate keeps the average well under max_load.
+    for _ in range(10):
+        for _ in range(49):
+            allocate(allocator, claimer([True])[0])
+        allocate(allocator, claimer([False, True])[0])
+    assert allocator.length() == 4
+    assert allocator.stats()["collisions"] == 10
+    assert allocator.stats()["widened"] == 0
+
+
+def test_widening_stops_at_max_length():
+    allocator = CodeAllocator(HEX_UPPER, min_length=4, max_length=5, max_attempts=8)
+    claim, seen = claimer([False] * 8)
+    with pytest.raises(CodeSpaceExhausted):
+        allocate(allocator, claim)
+    assert len(seen) == 8
+    assert max(len(code) for code in seen) == 5
+    assert allocator.length() == 5
+    assert allocator.stats()["exhausted"] == 1
+
+
+def test_scopes_widen_independently():
+    allocator = CodeAllocator(HEX_UPPER, min_length=4, max_length=8)
+    allocate(allocator, claimer([False, False, True])[0], scope="MATH")
+    assert allocator.length("MATH") == 5
+    assert allocator.length("PHYS") == 4
+    assert len(allocate(allocator, claimer([True])[0], scope="PHYS")) == 4
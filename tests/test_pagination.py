@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from shared.db.models import User
+from shared.services.pagination import Cursor, fetch_page
+
+START = datetime(2024, 3, 1, 12, 0, 0)
+
+
+class FakeSession:
+    """Returns canned rows and keeps the statement it was asked to run."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.stmt = None
+
+    async def execute(self, stmt):
+        self.stmt = stmt
+        return self
+
+    def all(self):
+        return self.rows
+
+
+def rows(ids):
+    return [(START + timedelta(minutes=row_id), row_id) for row_id in ids]
+
+
+def page(session, limit, cursor=None, backward=False, descending=True):
+    return asyncio.run(
+        fetch_page(
+            session,
+            select(User.created_at, User.id),
+            User.created_at,
+            User.id,
+            build=tuple,
+            key=lambda row: Cursor(*row),
+            limit=limit,
+            cursor=cursor,
+            backward=backward,
+            descending=descending,
+        )
+    )
+
+
+def compiled(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        Cursor(datetime(1970, 1, 1), 0),
+        Cursor(datetime(2024, 3, 1, 12, 30, 45, 123456), 1),
+        Cursor(datetime(2099, 12, 31, 23, 59, 59, 999999), 2**62),
+    ],
+)
+def test_cursor_round_trip(cursor):
+    raw = cursor.encode()
+    assert set(raw) <= set("0123456789abcdefghijklmnopqrstuvwxyz.")
+    assert Cursor.decode(raw) == cursor
+
+
+def test_cursor_keeps_microsecond_order():
+    earlier = Cursor(START, 5).encode()
+    later = Cursor(START + timedelta(microseconds=1), 5).encode()
+    assert earlier != later
+    assert Cursor.decode(later).created_at - Cursor.decode(earlier).created_at == timedelta(
+        microseconds=1
+    )
+
+
+def test_fetches_one_extra_row():
+    session = FakeSession(rows([3, 2, 1]))
+    page(session, limit=3)
+    query = compiled(session.stmt)
+    assert 4 in query.params.values()
+    assert "ORDER BY users.created_at DESC, users.id DESC" in str(query)
+
+
+def test_exactly_limit_rows_is_the_last_page():
+    result = page(FakeSession(rows([3, 2, 1])), limit=3)
+    assert [row_id for _, row_id in result.items] == [3, 2, 1]
+    assert result.next_cursor is None
+    assert result.prev_cursor is None
+
+
+def test_extra_row_means_another_page():
+    result = page(FakeSession(rows([4, 3, 2, 1])), limit=3)
+    assert [row_id for _, row_id in result.items] == [4, 3, 2]
+    assert result.next_cursor == Cursor(*rows([2])[0])
+    assert result.prev_cursor is None
+
+
+def test_forward_page_after_a_cursor():
+    cursor = Cursor(*rows([5])[0])
+    session = FakeSession(rows([4, 3]))
+    result = page(session, limit=3, cursor=cursor)
+    assert "(users.created_at, users.id) < (" in str(compiled(session.stmt))
+    assert result.prev_cursor == Cursor(*rows([4])[0])
+    assert result.next_cursor is None
+
+
+def test_backward_page_is_returned_in_display_order():
+    cursor = Cursor(*rows([2])[0])
+    # Rows before the cursor come back oldest first, plus the extra one.
+    session = FakeSession(rows([3, 4, 5, 6]))
+    result = page(session, limit=3, cursor=cursor, backward=True)
+    query = str(compiled(session.stmt))
+    assert "(users.created_at, users.id) > (" in query
+    assert "ORDER BY users.created_at ASC, users.id ASC" in query
+    assert [row_id for _, row_id in result.items] == [5, 4, 3]
+    assert result.prev_cursor == Cursor(*rows([5])[0])
+    assert result.next_cursor == Cursor(*rows([3])[0])
+
+
+def test_backward_to_the_first_page():
+    cursor = Cursor(*rows([2])[0])
+    result = page(FakeSession(rows([3, 4])), limit=3, cursor=cursor, backward=True)
+    assert [row_id for _, row_id in result.items] == [4, 3]
+    assert result.prev_cursor is None
+    assert result.next_cursor == Cursor(*rows([3])[0])
+
+
+def test_ascending_lists_page_forward_with_greater_than():
+    cursor = Cursor(*rows([1])[0])
+    session = FakeSession(rows([2, 3]))
+    page(session, limit=3, cursor=cursor, descending=False)
+    query = str(compiled(session.stmt))
+    assert "(users.created_at, users.id) > (" in query
+    assert "ORDER BY users.created_at ASC, users.id ASC" in query
+
+
+def test_empty_page_has_no_cursors():
+    result = page(FakeSession([]), limit=3, cursor=Cursor(START, 1))
+    assert result.items == []
+    assert result.prev_cursor is None
+    assert result.next_cursor is None
@@ -0,0 +1,90 @@
+from shared.services.score_ranks import (
+    ScoreHistogram,
+    Standing,
+    begin_load,
+    count_score,
+    finish_load,
+    score_ranks,
+)
+
+
+def histogram(max_score, scores):
+    result = ScoreHistogram(max_score)
+    for score in scores:
+        result.add(score)
+    return result
+
+
+def test_ties_share_a_rank():
+    scores = histogram(10, [9, 7, 7, 7, 3])
+    assert scores.standing(9) == Standing(rank=1, total=5, percentile=100)
+    # Three attempts tie on 7: all rank second, behind the single 9.
+    assert scores.standing(7) == Standing(rank=2, total=5, percentile=75)
+    assert scores.standing(3) == Standing(rank=5, total=5, percentile=0)
+
+
+def test_everyone_tied():
+    scores = histogram(10, [4, 4, 4, 4])
+    assert scores.standing(4) == Standing(rank=1, total=4, percentile=100)
+
+
+def test_percentile_counts_only_the_other_attempts():
+    scores = histogram(10, [10, 8, 6])
+    # Two others; one of them (6) scored at most 8.
+    assert scores.standing(8) == Standing(rank=2, total=3, percentile=50)
+
+
+def test_percentile_is_rounded():
+    scores = histogram(10, [9, 8, 5, 2])
+    assert scores.standing(5).percentile == 33
+
+
+def test_only_attempt_beats_nobody_but_is_first():
+    assert histogram(10, [6]).standing(6) == Standing(rank=1, total=1, percentile=100)
+
+
+def test_empty_cohort():
+    scores = ScoreHistogram(10)
+    assert scores.total == 0
+    assert scores.standing(5) == Standing(rank=1, total=0, percentile=100)
+
+
+def test_zero_max_score():
+    scores = histogram(0, [0, 0])
+    assert scores.counts == [2]
+    assert scores.standing(0) == Standing(rank=1, total=2, percentile=100)
+
+
+def test_out_of_range_scores_are_clamped():
+    scores = histogram(5, [7, -1, 3])
+    assert scores.counts == [1, 0, 0, 1, 0, 1]
+    assert scores.standing(9) == Standing(rank=1, total=3, percentile=100)
+    assert scores.standing(-2) == Standing(rank=3, total=3, percentile=0)
+
+
+def test_bulk_add_matches_single_adds():
+    bulk = ScoreHistogram(10)
+    bulk.add(7, 3)
+    bulk.add(2, 2)
+    single = histogram(10, [7, 7, 7, 2, 2])
+    assert bulk.counts == single.counts
+    assert bulk.standing(2) == single.standing(2)
+
+
+def test_submit_during_load_rejects_the_loaded_histogram():
+    score_ranks.invalidate(1)
+    generation = begin_load(1)
+    # The load's snapshot may or may not include this submit.
+    count_score(1, 7)
+    finish_load(1, histogram(10, [7, 5]), generation)
+    assert score_ranks.peek(1) is None
+
+
+def test_submit_after_load_is_counted_once():
+    score_ranks.invalidate(2)
+    generation = begin_load(2)
+    finish_load(2, histogram(10, [5]), generation)
+    count_score(2, 7)
+    cached = score_ranks.peek(2)
+    assert cached.total == 2
+    assert cached.standing(7) == Standing(rank=1, total=2, percentile=100)
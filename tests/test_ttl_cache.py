@@ -0,0 +1,72 @@
+import pytest
+
+from shared.utils import ttl_cache
+from shared.utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_hit_miss_and_cached_none(clock):
+    cache: TTLCache[int, str | None] = TTLCache(maxsize=4, ttl=10)
+    assert cache.get(1) == (False, None)
+    cache.put(1, None, cache.generation)
+    cache.put(2, "two", cache.generation)
+    assert cache.get(1) == (True, None)
+    assert cache.get(2) == (True, "two")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.6667)
+
+
+def test_entries_expire(clock):
+    cache: TTLCache[int, str] = TTLCache(maxsize=4, ttl=10)
+    cache.put(1, "one", cache.generation)
+    clock[0] += 10
+    assert cache.peek(1) == "one"
+    clock[0] += 0.1
+    assert cache.get(1) == (False, None)
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache: TTLCache[int, int] = TTLCache(maxsize=2, ttl=10)
+    cache.put(1, 1, cache.generation)
+    cache.put(2, 2, cache.generation)
+    cache.get(1)
+    cache.put(3, 3, cache.generation)
+    assert cache.peek(2) is None
+    assert cache.peek(1) == 1
+    assert cache.peek(3) == 3
+
+
+def test_peek_does_not_touch_lru_or_stats(clock):
+    cache: TTLCache[int, int] = TTLCache(maxsize=2, ttl=10)
+    cache.put(1, 1, cache.generation)
+    cache.put(2, 2, cache.generation)
+    cache.peek(1)
+    cache.put(3, 3, cache.generation)
+    assert cache.peek(1) is None
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+
+def test_put_after_invalidation_is_skipped(clock):
+    cache: TTLCache[int, str] = TTLCache(maxsize=4, ttl=10)
+    generation = cache.generation
+    cache.put(1, "old", generation)
+    cache.invalidate(1)
+    # A reader that loaded before the invalidation must not store its value.
+    cache.put(1, "stale", generation)
+    assert cache.peek(1) is None
+    cache.put(1, "fresh", cache.generation)
+    assert cache.peek(1) == "fresh"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_zero_size_caches_nothing(clock):
+    cache: TTLCache[int, str] = TTLCache(maxsize=0, ttl=10)
+    cache.put(1, "one", cache.generation)
+    assert cache.get(1) == (False, None)
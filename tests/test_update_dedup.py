@@ -0,0 +1,91 @@
+import pytest
+
+from bot import update_dedup
+from bot.update_dedup import UpdateDeduplicator
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(update_dedup.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_redelivery_is_detected(clock):
+    dedup = UpdateDeduplicator(size=4, max_age=60)
+    assert dedup.check_and_add(1) is False
+    assert dedup.check_and_add(2) is False
+    assert dedup.check_and_add(1) is True
+    assert dedup.stats()["absorbed"] == 1
+    assert dedup.stats()["tracked"] == 2
+
+
+def test_full_ring_evicts_oldest(clock):
+    dedup = UpdateDeduplicator(size=3, max_age=60)
+    for update_id in (1, 2, 3, 4):
+        assert dedup.check_and_add(update_id) is False
+    assert dedup.stats()["tracked"] == 3
+    # 2..4 are still in the window; 1 was pushed out by 4.
+    for update_id in (2, 3, 4):
+        assert dedup.check_and_add(update_id) is True
+    assert dedup.check_and_add(1) is False
+
+
+def test_ring_wraps_many_times(clock):
+    dedup = UpdateDeduplicator(size=5, max_age=60)
+    for update_id in range(100):
+        dedup.check_and_add(update_id)
+    assert dedup.stats()["tracked"] == 5
+    assert all(dedup.check_and_add(update_id) for update_id in range(95, 100))
+    assert dedup.check_and_add(94) is False
+
+
+def test_entries_expire_after_max_age(clock):
+    dedup = UpdateDeduplicator(size=10, max_age=60)
+    dedup.check_and_add(1)
+    clock[0] += 30
+    dedup.check_and_add(2)
+    clock[0] += 30
+    # Exactly max_age old is still inside the window.
+    assert dedup.check_and_add(1) is True
+    clock[0] += 0.5
+    assert dedup.check_and_add(1) is False
+    assert dedup.check_and_add(2) is True
+    clock[0] += 61
+    assert dedup.check_and_add(2) is False
+    assert dedup.stats()["tracked"] == 1
+
+
+def test_forget_rewinds_latest_and_blanks_older_ids(clock):
+    dedup = UpdateDeduplicator(size=4, max_age=60)
+    dedup.check_and_add(1)
+    dedup.check_and_add(2)
+    dedup.forget(1)
+    # 1 is no longer the latest, so its slot stays in the ring, blanked.
+    assert dedup.stats()["tracked"] == 2
+    dedup.forget(2)
+    assert dedup.stats()["tracked"] == 1
+    assert dedup.check_and_add(2) is False
+    assert dedup.check_and_add(1) is False
+
+
+def test_failed_dispatch_can_be_retried(clock):
+    dedup = UpdateDeduplicator(size=4, max_age=60)
+    assert dedup.check_and_add(1) is False
+    # Update 2 arrives while 1 is still being dispatched; then 1's handler raises.
+    assert dedup.check_and_add(2) is False
+    dedup.forget(1)
+    assert dedup.check_and_add(1) is False
+    assert dedup.check_and_add(1) is True
+    assert dedup.check_and_add(2) is True
+
+
+def test_forgotten_slot_does_not_evict_a_redelivery(clock):
+    dedup = UpdateDeduplicator(size=3, max_age=60)
+    dedup.check_and_add(1)
+    dedup.check_and_add(2)
+    dedup.forget(1)
+    dedup.check_and_add(1)
+    # Pushing the blanked slot out of the ring must not drop the retried id.
+    dedup.check_and_add(3)
+    assert dedup.check_and_add(1) is True